@@ -0,0 +1,10 @@
+# config/constants.py
+# Streamlit 없이 import하는 상수 (파싱/탐지 워커 프로세스에서 쓰는 로더/Parquet/임계값 설정) - config.settings에서도 그대로 노출
+
+# Parquet 저장/읽기
+PARQUET_COMPRESSION = "zstd"
+PARQUET_ROW_GROUP_ROWS = 100_000    # 행 그룹 크기 (컬럼 구간 읽기 단위)
+PARQUET_RANGE_READ_MIN_BYTES = 1024 * 1024   # 이보다 큰 Parquet 블롭만 구간(range) 읽기
+
+# 임계값 프로필 필드 (병렬 탐지 워커의 행별 임계값 행렬 행 순서와 동일)
+THRESHOLD_PROFILE_FIELDS = ["min_amount", "min_lines", "change_threshold"]
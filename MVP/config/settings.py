@@ -1,4 +1,6 @@
 # config/settings.py
+import os
+import json
 import streamlit as st
 
 def setup_page_config():
@@ -16,5 +18,81 @@ MIN_AMOUNT_DEFAULT = 10_000_000
 MIN_LINES_DEFAULT = 500
 CHANGE_THRESHOLD_DEFAULT = 15
 
+# 그룹별 임계값 프로필 (lob 또는 요금유형코드 기준, 없는 그룹은 화면 입력값 사용)
+# 파일이 없으면 모든 그룹에 화면 입력값 적용 - threshold_profiles.example.json을 복사해서 사용
+THRESHOLD_PROFILES_PATH = os.path.join(os.path.dirname(__file__), "threshold_profiles.json")
+from config.constants import THRESHOLD_PROFILE_FIELDS
+
+def load_threshold_profiles(path=THRESHOLD_PROFILES_PATH):
+    """임계값 프로필 설정 파일 읽기 ({"key": 그룹 컬럼, "profiles": {그룹값: {임계값...}}})"""
+    if not os.path.exists(path):
+        return {"key": None, "profiles": {}}
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    return {"key": config.get("key"), "profiles": config.get("profiles") or {}}
+
 # API 설정
-API_VERSION = "2024-05-01-preview"
\ No newline at end of file
+API_VERSION = "2024-05-01-preview"
+
+# 데이터 수집(ingest) 설정
+CSV_BLOCK_SIZE = 16 * 1024 * 1024   # pyarrow 블록 단위 병렬 파싱 크기 (bytes)
+CSV_CHUNK_ROWS = 200_000            # pandas 청크 단위 읽기 행 수 (pyarrow 미설치 시)
+INGEST_CACHE_MAX_ENTRIES = 2        # 세션별로 유지할 수집 결과(내용 해시 기준) 개수
+
+# 병렬 이상 탐지 설정 (월/LOB 파티션 단위 프로세스 풀)
+PARALLEL_DETECTION_WORKERS = min(16, os.cpu_count() or 1)
+PARALLEL_DETECTION_MIN_ROWS = 500_000   # 이 행 수 이상일 때만 병렬 탐지 사용
+PARALLEL_PARTITION_KEYS = ["기준월", "lob"]
+
+# 이상 탐지 방식 ("threshold": 고정 임계값, "robust": 그룹별 로버스트 Z 점수)
+DETECTION_MODE_DEFAULT = "threshold"
+ROBUST_GROUP_KEYS = ["lob", "요금유형코드"]
+ROBUST_Z_THRESHOLD = 3.5
+DETECTION_MODES = {"임계값": "threshold", "그룹 통계 (로버스트 Z)": "robust"}
+
+# Azure 데이터 로드 설정 (다운로드는 스레드, 파싱은 프로세스 단위 병렬)
+AZURE_DOWNLOAD_WORKERS = 8
+AZURE_PARSE_WORKERS = min(4, os.cpu_count() or 1)
+
+# Azure 공용 클라이언트 (HTTP 연결 풀 크기, 연결 상태 확인 결과 재사용 시간(초) - 성공/실패)
+AZURE_HTTP_POOL_SIZE = max(10, AZURE_DOWNLOAD_WORKERS * 2)
+AZURE_HEALTH_CHECK_INTERVAL = int(os.getenv("AZURE_HEALTH_CHECK_INTERVAL", 300))
+AZURE_HEALTH_CHECK_RETRY_INTERVAL = 10
+
+# Azure 백그라운드 업로드 (큰 파일은 블록 단위 병렬 업로드, 실패 시 지수 백오프 재시도)
+AZURE_UPLOAD_WORKERS = 2
+AZURE_UPLOAD_RETRIES = 3
+AZURE_UPLOAD_BACKOFF_SECONDS = 2
+AZURE_UPLOAD_CONCURRENCY = 4                   # 블롭 하나당 동시 블록 업로드 수
+AZURE_UPLOAD_BLOCK_BYTES = 4 * 1024 * 1024
+AZURE_UPLOAD_SINGLE_PUT_BYTES = 8 * 1024 * 1024   # 이보다 큰 데이터는 블록으로 나눠 업로드
+UPLOAD_STATUS_MAX_JOBS = 20                    # 상태 목록에 남겨둘 작업 수
+
+# 로컬 블롭 캐시 (파싱된 월별 프레임을 Parquet로 보관, 용량 초과 시 오래 안 쓴 항목부터 삭제)
+BLOB_CACHE_DIR = os.getenv(
+    "BLOB_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "blobs")
+)
+BLOB_CACHE_MAX_BYTES = int(os.getenv("BLOB_CACHE_MAX_BYTES", 1024 * 1024 * 1024))
+
+# Azure 분석 대상 폴더 (이 접두사로만 목록 조회) + 동기화 커서 (마지막 동기화 시점의 블롭 버전)
+AZURE_DATA_PREFIXES = ["monthly_data/", "plan_metadata/"]
+AZURE_SYNC_CURSOR_PATH = os.path.join(BLOB_CACHE_DIR, "sync_cursor.json")
+
+# 월 데이터 파일별 LOB × 서비스 집계 사이드카 위치 (개요/LOB/트렌드 질문은 이 집계만 읽음)
+ROLLUP_PREFIX = "rollups/"
+
+# 파티션 매니페스트 (월 데이터 파일별 월/행 수/컬럼/금액 범위/서비스 코드) - 질문에 필요한 월만 골라서 로드
+MANIFEST_BLOB = "monthly_data/_manifest.json"
+
+# Excel 파일은 한 번만 파싱해서 Parquet 변환본(원본 ETag 기록)으로 저장 - 변환 전에는 백그라운드에서 파싱
+CONVERTED_PREFIX = "converted/"
+EXCEL_CONVERT_WORKERS = 1
+
+# Azure 분석 데이터 공용 캐시 유지 시간 (초) - 모든 세션이 같은 데이터를 공유
+AZURE_DATA_CACHE_TTL = int(os.getenv("AZURE_DATA_CACHE_TTL", 600))
+AZURE_MONTH_VIEW_CACHE_ENTRIES = 3   # 질문별 월 × 컬럼 데이터 보관 개수 (최근 사용 순, 각각 팩트 테이블 1개 포함)
+
+# Azure 저장 형식 ("parquet": 월 단위 Parquet 파티션, "csv": 기존 CSV) - pyarrow 미설치 시 CSV
+AZURE_STORAGE_FORMAT = os.getenv("AZURE_STORAGE_FORMAT", "parquet")
+from config.constants import PARQUET_COMPRESSION, PARQUET_ROW_GROUP_ROWS, PARQUET_RANGE_READ_MIN_BYTES
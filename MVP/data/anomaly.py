@@ -0,0 +1,142 @@
+# data/anomaly.py
+# 컬럼 단위(벡터화) 이상 탐지 엔진 - 행 단위 apply 없이 NumPy 배열 연산으로 처리
+import numpy as np
+import pandas as pd
+
+# 이상 탐지에 사용하는 숫자 컬럼
+ANOMALY_NUMERIC_COLUMNS = ["m1요청금액", "m2요청금액", "m1월회선수", "m2월회선수", "m1청구금액", "m2청구금액"]
+
+# 이상 유형 라벨 조합표 (카테고리 코드 → 라벨 문자열)
+_CHANGE_LABELS = {
+    "청구금액": ["", "청구금액 급증", "청구금액 급감"],
+    "회선수": ["", "회선수 급증", "회선수 급감"],
+}
+_AMOUNT_LABELS = ["", "고액 요청"]
+_ARPU_LABELS = ["", "저ARPU", "고ARPU"]
+
+
+def _build_label_table():
+    """코드 조합별 이상 유형 라벨 생성 (청구금액 3 × 회선수 3 × 고액 2 × ARPU 3)"""
+    table = []
+    for amount_label in _CHANGE_LABELS["청구금액"]:
+        for lines_label in _CHANGE_LABELS["회선수"]:
+            for request_label in _AMOUNT_LABELS:
+                for arpu_label in _ARPU_LABELS:
+                    types = [t for t in (amount_label, lines_label, request_label, arpu_label) if t]
+                    table.append(" / ".join(types) if types else "기타")
+    return np.array(table, dtype=object)
+
+
+ANOMALY_LABEL_TABLE = _build_label_table()
+
+
+def _as_float(values):
+    """float64 배열로 변환 (결측값은 NaN)"""
+    return np.asarray(values, dtype="float64")
+
+
+def _change_rate(current, previous):
+    """변화율(%) 계산 - 이전 값이 0 이하(또는 결측)이면 0"""
+    rate = np.zeros(len(current), dtype="float64")
+    np.divide(current - previous, previous, out=rate, where=previous > 0)
+    rate *= 100
+    return rate
+
+
+def compute_change_metrics(m1_amount, m2_amount, m1_lines, m2_lines):
+    """ARPU, 청구금액 변화율, 회선수 변화율 계산"""
+    m1_amount = _as_float(m1_amount)
+    m2_amount = _as_float(m2_amount)
+    m1_lines = _as_float(m1_lines)
+    m2_lines = _as_float(m2_lines)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        arpu = np.zeros(len(m1_amount), dtype="float64")
+        np.divide(m1_amount, m1_lines, out=arpu, where=m1_lines > 0)
+
+        amount_rate = _change_rate(m1_amount, m2_amount)
+        lines_rate = _change_rate(m1_lines, m2_lines)
+
+    return arpu, amount_rate, lines_rate
+
+
+def build_anomaly_mask(m1_request, m2_request, m1_lines, m2_lines, arpu, amount_rate, lines_rate,
+                       min_amount, min_lines, change_threshold):
+    """이상 데이터 필터링 조건 (모든 조건을 만족하는 행만 True)"""
+    m1_request = _as_float(m1_request)
+    m2_request = _as_float(m2_request)
+    m1_lines = _as_float(m1_lines)
+    m2_lines = _as_float(m2_lines)
+
+    with np.errstate(invalid="ignore"):
+        mask = (m1_lines + m2_lines) > 0
+        mask &= (m1_request >= min_amount) | (m2_request >= min_amount)
+        mask &= m1_lines > min_lines
+        mask &= arpu >= 0.1
+        mask &= np.abs(amount_rate) >= change_threshold
+        mask &= np.abs(lines_rate) >= change_threshold
+    return mask
+
+
+def robust_z_scores(values, group_codes):
+    """그룹별 중앙값/MAD 기반 로버스트 Z 점수 (groupby transform으로 한 번에 계산)
+
+    MAD가 0인 그룹은 평균절대편차(×1.2533)로 대체하고, 그것도 0이면 점수 0.
+    """
+    series = pd.Series(_as_float(values))
+    median = series.groupby(group_codes).transform("median")
+    deviation = series - median
+    abs_grouped = deviation.abs().groupby(group_codes)
+    mad = abs_grouped.transform("median").to_numpy()
+    mean_ad = abs_grouped.transform("mean").to_numpy()
+    deviation = deviation.to_numpy()
+
+    scale = np.where(mad > 0, mad / 0.6745, mean_ad * 1.253314)
+    z = np.zeros(len(series), dtype="float64")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        np.divide(deviation, scale, out=z, where=scale > 0)
+    z[np.isnan(deviation)] = np.nan
+    return z
+
+
+def build_robust_mask(m1_request, m2_request, m1_lines, m2_lines, arpu, score, min_amount, min_lines, z_threshold):
+    """그룹 통계 모드 필터링 조건 (변화율 임계값 대신 로버스트 Z 점수 사용)"""
+    m1_request = _as_float(m1_request)
+    m2_request = _as_float(m2_request)
+    m1_lines = _as_float(m1_lines)
+    m2_lines = _as_float(m2_lines)
+
+    with np.errstate(invalid="ignore"):
+        mask = (m1_lines + m2_lines) > 0
+        mask &= (m1_request >= min_amount) | (m2_request >= min_amount)
+        mask &= m1_lines > min_lines
+        mask &= arpu >= 0.1
+        mask &= _as_float(score) >= z_threshold
+    return mask
+
+
+def _direction_code(rate, threshold):
+    """변화율 방향 코드 (0: 해당 없음, 1: 급증, 2: 급감)"""
+    significant = np.abs(rate) >= threshold
+    return np.where(significant, np.where(rate > 0, 1, 2), 0)
+
+
+def classify_anomaly_codes(amount_rate, lines_rate, m1_request, arpu, min_amount, change_threshold):
+    """이상 유형 카테고리 코드 계산 (ANOMALY_LABEL_TABLE 인덱스)"""
+    m1_request = _as_float(m1_request)
+    arpu = _as_float(arpu)
+
+    with np.errstate(invalid="ignore"):
+        amount_code = _direction_code(_as_float(amount_rate), change_threshold)
+        lines_code = _direction_code(_as_float(lines_rate), change_threshold)
+        request_code = (m1_request >= min_amount).astype("int64")
+        # ARPU가 너무 낮은 경우 1, 너무 높은 경우 2
+        arpu_code = np.where(arpu < 1000, 1, np.where(arpu > 50000, 2, 0))
+
+    return ((amount_code * 3 + lines_code) * 2 + request_code) * 3 + arpu_code
+
+
+def classify_anomaly_types(amount_rate, lines_rate, m1_request, arpu, min_amount, change_threshold):
+    """이상 유형 라벨 배열 ("청구금액 급증 / 고액 요청" 등)"""
+    codes = classify_anomaly_codes(amount_rate, lines_rate, m1_request, arpu, min_amount, change_threshold)
+    return ANOMALY_LABEL_TABLE[codes]
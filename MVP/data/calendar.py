@@ -0,0 +1,135 @@
+# data/calendar.py
+# 한국 공휴일 반영 영업일 캘린더 - 프로세스 공용 (연도 단위 사전 계산 + 월별 O(1) 조회)
+import threading
+import numpy as np
+import holidays
+
+WEEKMASK = "1111100"  # 월~금 영업, 토/일 휴무
+
+
+class KoreanBusinessCalendar:
+    """한국 영업일 캘린더 (필요한 연도만 사전 계산)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.holidays = holidays.KR(years=[])
+        self._years = set()
+        self._month_table = {}
+        self._busdaycal = np.busdaycalendar(weekmask=WEEKMASK)
+
+    def ensure_years(self, years):
+        """해당 연도들의 공휴일/영업일 테이블 준비 (이미 준비된 연도는 건너뜀)"""
+        missing = {int(y) for y in years} - self._years
+        if not missing:
+            return
+
+        with self._lock:
+            missing -= self._years
+            if not missing:
+                return
+
+            years = self._years | missing
+            kr_holidays = holidays.KR(years=sorted(years))
+
+            holiday_days = np.array(sorted(kr_holidays.keys()), dtype="datetime64[D]")
+            busdaycal = np.busdaycalendar(weekmask=WEEKMASK, holidays=holiday_days)
+
+            month_table = dict(self._month_table)
+            for year in sorted(missing):
+                month_table.update(self._build_year(year, busdaycal, kr_holidays))
+
+            # 모든 테이블이 준비된 후 한 번에 교체 (조회 측은 잠금 불필요)
+            self.holidays = kr_holidays
+            self._busdaycal = busdaycal
+            self._month_table = month_table
+            self._years = years
+
+    def _build_year(self, year, busdaycal, kr_holidays):
+        """1년치 월별 영업일 정보 계산"""
+        days = np.arange(f"{year}-01-01", f"{year + 1}-01-01", dtype="datetime64[D]")
+        # 1970-01-01은 목요일(weekday=3)
+        weekday = (days.astype("int64") + 3) % 7
+        weekend = weekday >= 5
+        business = np.is_busday(days, busdaycal=busdaycal)
+        holiday = ~weekend & ~business
+        month_index = days.astype("datetime64[M]").astype("int64") % 12
+
+        table = {}
+        for month in range(1, 13):
+            in_month = month_index == (month - 1)
+            holiday_list = []
+            for day in days[in_month & holiday]:
+                date = day.item()
+                holiday_list.append({
+                    'date': date.strftime('%m-%d'),
+                    'name': kr_holidays.get(date, '공휴일')
+                })
+
+            table[(year, month)] = {
+                'year': year,
+                'month': month,
+                'total_days': int(in_month.sum()),
+                'business_days': int((in_month & business).sum()),
+                'weekend_days': int((in_month & weekend).sum()),
+                'holiday_days': int((in_month & holiday).sum()),
+                'holiday_list': holiday_list
+            }
+        return table
+
+    def month_info(self, year, month):
+        """월별 영업일 상세 정보 (총 일수, 영업일, 주말, 공휴일 목록)"""
+        key = (int(year), int(month))
+        if key not in self._month_table:
+            self.ensure_years([key[0]])
+        info = self._month_table[key]
+        return {**info, 'holiday_list': [dict(h) for h in info['holiday_list']]}
+
+    def business_days(self, year, month):
+        """월별 영업일 수"""
+        key = (int(year), int(month))
+        if key not in self._month_table:
+            self.ensure_years([key[0]])
+        return self._month_table[key]['business_days']
+
+    def holiday_list(self, year, month):
+        """월별 평일 공휴일 목록"""
+        return self.month_info(year, month)['holiday_list']
+
+    def _ensure_range(self, *date_arrays):
+        """날짜 배열들이 걸쳐 있는 연도 준비"""
+        years = set()
+        for dates in date_arrays:
+            dates = np.asarray(dates, dtype="datetime64[D]")
+            valid = dates[~np.isnat(dates)]
+            if len(valid) > 0:
+                first, last = valid.min(), valid.max()
+                years.update(range(first.astype("datetime64[Y]").astype(int) + 1970,
+                                   last.astype("datetime64[Y]").astype(int) + 1971))
+        self.ensure_years(years)
+
+    def busday_count(self, begin_dates, end_dates):
+        """[begin, end) 구간의 영업일 수 (배열 단위 벡터 연산)"""
+        begin_dates = np.asarray(begin_dates, dtype="datetime64[D]")
+        end_dates = np.asarray(end_dates, dtype="datetime64[D]")
+        self._ensure_range(begin_dates, end_dates)
+        return np.busday_count(begin_dates, end_dates, busdaycal=self._busdaycal)
+
+    def is_business_day(self, dates):
+        """영업일 여부 (배열 단위 벡터 연산)"""
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        self._ensure_range(dates)
+        return np.is_busday(dates, busdaycal=self._busdaycal)
+
+
+_calendar = None
+_calendar_lock = threading.Lock()
+
+
+def get_business_calendar():
+    """프로세스 공용 영업일 캘린더 반환"""
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                _calendar = KoreanBusinessCalendar()
+    return _calendar
@@ -0,0 +1,159 @@
+# data/ingest.py
+# 청구 CSV 수집 - 명시적 스키마 + 청크(블록) 단위 읽기로 메모리 사용량 최소화
+import re
+import hashlib
+import numpy as np
+import pandas as pd
+from config.settings import CSV_BLOCK_SIZE, CSV_CHUNK_ROWS
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow 미설치 시 pandas 청크 읽기로 대체
+    pa = None
+    pa_csv = None
+
+# m1/m2/m3 숫자 컬럼 (정규화된 컬럼명 기준)
+NUMERIC_COLUMN_PATTERN = re.compile(r"^m[123](요청금액|할인금액|청구금액|월회선수|신규회선수|해지회선수|arpu)$")
+
+# 문자열로 고정할 컬럼 (추론 시 숫자/날짜로 바뀌는 것 방지)
+TEXT_COLUMNS = ["lob", "lob명", "청구항목id", "청구항목명", "단위서비스id", "단위서비스명", "요금유형코드", "기준월"]
+
+# 반복이 많은 라벨 컬럼 (카테고리형으로 압축)
+LABEL_COLUMNS = ["lob", "lob명", "청구항목명", "단위서비스명", "요금유형코드"]
+CATEGORY_MAX_RATIO = 0.5  # 고유값 비율이 이 이하일 때만 카테고리로 변환
+
+
+def normalize_columns(columns):
+    """컬럼명 정리 (앞뒤 공백 제거, 소문자, 내부 공백 제거)"""
+    return pd.Index(columns).str.strip().str.lower().str.replace(" ", "")
+
+
+def build_schema(columns):
+    """정규화된 컬럼명 → dtype 스키마 ('float64' / 'string')"""
+    schema = {}
+    for col in columns:
+        if NUMERIC_COLUMN_PATTERN.match(col):
+            schema[col] = "float64"
+        elif col in TEXT_COLUMNS:
+            schema[col] = "string"
+    return schema
+
+
+def content_hash(source):
+    """업로드 파일 내용 해시 (버퍼 복사 없이 계산)"""
+    digest = hashlib.blake2b(digest_size=16)
+    if hasattr(source, "getbuffer"):
+        with source.getbuffer() as view:
+            digest.update(view)
+    else:
+        for block in iter(lambda: source.read(CSV_BLOCK_SIZE), b""):
+            digest.update(block)
+        source.seek(0)
+    return digest.hexdigest()
+
+
+def _read_header(source):
+    """헤더만 읽어서 원본 컬럼명 반환 (파일 위치는 처음으로 되돌림)"""
+    header = pd.read_csv(source, nrows=0).columns
+    source.seek(0)
+    return header
+
+
+def _read_with_pyarrow(source, columns, schema):
+    """pyarrow 멀티스레드 블록 파싱"""
+    column_types = {
+        col: pa.float64() if dtype == "float64" else pa.string()
+        for col, dtype in schema.items()
+    }
+    table = pa_csv.read_csv(
+        source,
+        read_options=pa_csv.ReadOptions(
+            use_threads=True,
+            block_size=CSV_BLOCK_SIZE,
+            column_names=list(columns),
+            skip_rows=1
+        ),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=column_types,
+            strings_can_be_null=True
+        )
+    )
+    # Arrow 버퍼를 변환하면서 바로 해제 → 최대 메모리 ≈ 최종 프레임 + 블록 1개
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _read_with_pandas_chunks(source, columns, schema):
+    """pandas 청크 단위 읽기 (청크마다 숫자 컬럼 변환)"""
+    text_dtypes = {col: "object" for col, dtype in schema.items() if dtype == "string"}
+    numeric_columns = [col for col, dtype in schema.items() if dtype == "float64"]
+
+    chunks = []
+    reader = pd.read_csv(
+        source,
+        header=0,
+        names=list(columns),
+        dtype=text_dtypes,
+        chunksize=CSV_CHUNK_ROWS
+    )
+    for chunk in reader:
+        for col in numeric_columns:
+            chunk[col] = pd.to_numeric(chunk[col], errors="coerce").astype("float64")
+        chunks.append(chunk)
+
+    if not chunks:
+        return pd.DataFrame(columns=list(columns))
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_billing_csv(source):
+    """청구 CSV 읽기 - 컬럼명 정규화 + 스키마 적용된 프레임 반환"""
+    columns = normalize_columns(_read_header(source))
+    schema = build_schema(columns)
+
+    if pa_csv is not None:
+        try:
+            return _read_with_pyarrow(source, columns, schema)
+        except pa.ArrowInvalid:
+            # 숫자 컬럼에 문자열이 섞인 경우 등 → pandas 경로로 재시도
+            source.seek(0)
+
+    return _read_with_pandas_chunks(source, columns, schema)
+
+
+def _downcast_float(series):
+    """실수 컬럼 축소 - 결측 없는 정수값이면 최소 정수형, 손실 없으면 float32"""
+    values = series.to_numpy()
+    finite = values[~np.isnan(values)]
+    if len(finite) == len(values) and np.array_equal(finite, np.floor(finite)):
+        return pd.to_numeric(series, downcast="integer")
+
+    as_float32 = values.astype("float32")
+    if np.array_equal(as_float32.astype("float64"), values, equal_nan=True):
+        return series.astype("float32")
+    return series
+
+
+def compact_frame(df):
+    """수집된 청구 프레임의 dtype 압축 - (압축된 프레임, 메모리 리포트) 반환"""
+    before = int(df.memory_usage(deep=True).sum())
+
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series) and not isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+            df[col] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series) and series.dtype == "float64":
+            df[col] = _downcast_float(series)
+        elif col in LABEL_COLUMNS and len(series) > 0:
+            if series.nunique(dropna=True) <= len(series) * CATEGORY_MAX_RATIO:
+                df[col] = series.astype("category")
+
+    after = int(df.memory_usage(deep=True).sum())
+    report = {
+        "before_bytes": before,
+        "after_bytes": after,
+        "saved_ratio": (1 - after / before) * 100 if before > 0 else 0
+    }
+    return df, report
@@ -0,0 +1,163 @@
+# data/parallel.py
+# 멀티코어 이상 탐지 - 월/LOB 파티션 단위로 프로세스 풀에서 실행 (공유 메모리 배열 사용)
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from config.constants import THRESHOLD_PROFILE_FIELDS
+from data.anomaly import ANOMALY_NUMERIC_COLUMNS, compute_change_metrics, build_anomaly_mask
+
+# 입력 행렬 행 순서 (ANOMALY_NUMERIC_COLUMNS 순서와 동일)
+_M1_REQUEST, _M2_REQUEST, _M1_LINES, _M2_LINES, _M1_AMOUNT, _M2_AMOUNT = range(6)
+# 출력 행렬 행 순서
+_ARPU, _AMOUNT_RATE, _LINES_RATE = range(3)
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def _get_executor(workers):
+    """프로세스 풀 (프로세스 공용, 워커 수가 바뀔 때만 재생성)"""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            # Streamlit 서버는 멀티스레드이므로 fork 대신 spawn 사용
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _executor_workers = workers
+        return _executor
+
+
+def _create_shared(array):
+    """배열을 공유 메모리에 복사"""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    shared[...] = array
+    del shared
+    return shm
+
+
+def _build_tasks(group_codes, workers):
+    """파티션 키(월/LOB) 순으로 정렬된 행 순서와 작업 구간 목록 생성
+
+    작은 그룹은 하나의 작업으로 묶고, 목표 크기보다 큰 그룹은 여러 구간으로 나눈다.
+    """
+    n_rows = len(group_codes)
+    order = np.argsort(group_codes, kind="stable")
+    group_sizes = np.bincount(group_codes) if n_rows > 0 else np.array([], dtype="int64")
+    target = max(1, -(-n_rows // (workers * 2)))
+
+    tasks = []
+    start = 0
+    position = 0
+    for size in group_sizes:
+        position += int(size)
+        if position - start >= target:
+            # 큰 그룹은 목표 크기 단위로 분할하고, 마지막 구간은 그룹 경계에서 끝냄
+            while position - start >= 2 * target:
+                tasks.append((start, start + target))
+                start += target
+            tasks.append((start, position))
+            start = position
+    if start < n_rows:
+        tasks.append((start, n_rows))
+    return order, tasks
+
+
+def _detect_partition(task):
+    """워커 프로세스: 한 파티션 구간의 파생 지표 계산 + 임계값 조건 적용"""
+    names, n_rows, start, stop, thresholds = task
+    # 해제(unlink)는 공유 메모리를 생성한 부모 프로세스가 담당
+    input_shm = shared_memory.SharedMemory(name=names["input"])
+    output_shm = shared_memory.SharedMemory(name=names["output"])
+    order_shm = shared_memory.SharedMemory(name=names["order"])
+    limits_shm = shared_memory.SharedMemory(name=names["limits"]) if "limits" in names else None
+    limits = None
+    try:
+        values = np.ndarray((len(ANOMALY_NUMERIC_COLUMNS), n_rows), dtype="float64", buffer=input_shm.buf)
+        outputs = np.ndarray((3, n_rows), dtype="float64", buffer=output_shm.buf)
+        order = np.ndarray((n_rows,), dtype="int64", buffer=order_shm.buf)
+
+        rows = order[start:stop].copy()
+        if limits_shm is not None:
+            # 그룹별 프로필 임계값 → 이 구간 행들의 임계값 배열
+            limits = np.ndarray((len(THRESHOLD_PROFILE_FIELDS), n_rows), dtype="float64", buffer=limits_shm.buf)
+            thresholds = dict(zip(THRESHOLD_PROFILE_FIELDS, limits[:, rows]))
+        part = values[:, rows]
+        arpu, amount_rate, lines_rate = compute_change_metrics(
+            part[_M1_AMOUNT], part[_M2_AMOUNT], part[_M1_LINES], part[_M2_LINES]
+        )
+        outputs[_ARPU, rows] = arpu
+        outputs[_AMOUNT_RATE, rows] = amount_rate
+        outputs[_LINES_RATE, rows] = lines_rate
+
+        mask = build_anomaly_mask(
+            part[_M1_REQUEST], part[_M2_REQUEST], part[_M1_LINES], part[_M2_LINES],
+            arpu, amount_rate, lines_rate,
+            thresholds["min_amount"], thresholds["min_lines"], thresholds["change_threshold"]
+        )
+        return rows[mask]
+    finally:
+        del values, outputs, order, limits
+        input_shm.close()
+        output_shm.close()
+        order_shm.close()
+        if limits_shm is not None:
+            limits_shm.close()
+
+
+def detect_partitioned(frame, partition_keys, min_amount, min_lines, change_threshold, workers):
+    """월/LOB 파티션 병렬 이상 탐지 (임계값은 스칼라 또는 행별 배열)
+
+    반환: (arpu, 청구금액 변화율, 회선수 변화율, 탐지된 행 위치) - 행 위치는 원본 순서로 정렬
+    """
+    n_rows = len(frame)
+    values = np.empty((len(ANOMALY_NUMERIC_COLUMNS), n_rows), dtype="float64")
+    for i, col in enumerate(ANOMALY_NUMERIC_COLUMNS):
+        values[i] = frame[col].to_numpy(dtype="float64", na_value=np.nan)
+
+    if partition_keys:
+        group_codes = frame.groupby(partition_keys, sort=True, observed=True, dropna=False).ngroup().to_numpy()
+    else:
+        group_codes = np.zeros(n_rows, dtype="int64")
+    order, tasks = _build_tasks(group_codes, workers)
+
+    thresholds = {"min_amount": min_amount, "min_lines": min_lines, "change_threshold": change_threshold}
+    row_wise = any(np.ndim(value) > 0 for value in thresholds.values())
+    shared = []
+    try:
+        input_shm = _create_shared(values)
+        shared.append(input_shm)
+        output_shm = _create_shared(np.zeros((3, n_rows), dtype="float64"))
+        shared.append(output_shm)
+        order_shm = _create_shared(order.astype("int64"))
+        shared.append(order_shm)
+        del values
+
+        names = {"input": input_shm.name, "output": output_shm.name, "order": order_shm.name}
+        if row_wise:
+            limits = np.empty((len(THRESHOLD_PROFILE_FIELDS), n_rows), dtype="float64")
+            for i, field in enumerate(THRESHOLD_PROFILE_FIELDS):
+                limits[i] = thresholds[field]
+            limits_shm = _create_shared(limits)
+            shared.append(limits_shm)
+            names["limits"] = limits_shm.name
+            thresholds = None
+            del limits
+        executor = _get_executor(workers)
+        # map은 작업 순서대로 결과를 돌려주므로 병합 결과가 항상 동일
+        flagged_parts = list(executor.map(
+            _detect_partition,
+            [(names, n_rows, start, stop, thresholds) for start, stop in tasks]
+        ))
+
+        flagged = np.sort(np.concatenate(flagged_parts)) if flagged_parts else np.array([], dtype="int64")
+        outputs = np.ndarray((3, n_rows), dtype="float64", buffer=output_shm.buf).copy()
+        return outputs[_ARPU], outputs[_AMOUNT_RATE], outputs[_LINES_RATE], flagged
+    finally:
+        for shm in shared:
+            shm.close()
+            shm.unlink()
@@ -1,91 +1,57 @@
 # data/processor.py (한국 공휴일 고려 버전)
+import numpy as np
 import pandas as pd
 import streamlit as st
 from pandas.tseries.offsets import BDay
-import holidays
 import datetime
-from config.settings import MIN_AMOUNT_DEFAULT, MIN_LINES_DEFAULT, CHANGE_THRESHOLD_DEFAULT
+from functools import partial
+from config.settings import (
+    MIN_AMOUNT_DEFAULT, MIN_LINES_DEFAULT, CHANGE_THRESHOLD_DEFAULT, INGEST_CACHE_MAX_ENTRIES,
+    PARALLEL_DETECTION_WORKERS, PARALLEL_DETECTION_MIN_ROWS, PARALLEL_PARTITION_KEYS,
+    DETECTION_MODE_DEFAULT, ROBUST_GROUP_KEYS, ROBUST_Z_THRESHOLD,
+    THRESHOLD_PROFILE_FIELDS, load_threshold_profiles
+)
+from data.calendar import get_business_calendar
+from data.ingest import read_billing_csv, compact_frame, content_hash
+from data.parallel import detect_partitioned
+from data.anomaly import (
+    ANOMALY_NUMERIC_COLUMNS,
+    compute_change_metrics,
+    build_anomaly_mask,
+    build_robust_mask,
+    robust_z_scores,
+    classify_anomaly_types,
+)
 
 class DataProcessor:
     def __init__(self):
-        # 한국 공휴일 (2024-2026년까지)
-        self.kr_holidays = holidays.KR(years=[2024, 2025, 2026])
+        # 한국 영업일 캘린더 (프로세스 공용, 필요한 연도만 사전 계산)
+        self.calendar = get_business_calendar()
         self.min_amount = MIN_AMOUNT_DEFAULT
         self.min_lines = MIN_LINES_DEFAULT
         self.change_threshold = CHANGE_THRESHOLD_DEFAULT
+        self.parallel_workers = PARALLEL_DETECTION_WORKERS
+        # 탐지 방식 ("threshold": 고정 임계값, "robust": lob/요금유형 그룹별 로버스트 Z 점수)
+        self.detection_mode = DETECTION_MODE_DEFAULT
+        self.z_threshold = ROBUST_Z_THRESHOLD
+        # 그룹별 임계값 프로필 (config/threshold_profiles.json)
+        try:
+            self.threshold_profiles = load_threshold_profiles()
+        except Exception as e:
+            st.warning(f"⚠️ 임계값 프로필을 읽지 못해 공통 임계값을 사용합니다: {str(e)}")
+            self.threshold_profiles = {"key": None, "profiles": {}}
     
-    def update_thresholds(self, min_amount, min_lines, change_threshold):
+    def update_thresholds(self, min_amount, min_lines, change_threshold, detection_mode=None):
         """임계값 업데이트"""
         self.min_amount = min_amount
         self.min_lines = min_lines
         self.change_threshold = change_threshold
+        if detection_mode is not None:
+            self.detection_mode = detection_mode
     
     def calculate_korean_business_days(self, year, month):
-        """한국 공휴일을 고려한 영업일 수 계산"""
-        # 해당 월의 첫째 날과 마지막 날
-        start_date = datetime.date(year, month, 1)
-        if month == 12:
-            end_date = datetime.date(year + 1, 1, 1) - datetime.timedelta(days=1)
-        else:
-            end_date = datetime.date(year, month + 1, 1) - datetime.timedelta(days=1)
-        
-        # 전체 날짜 생성
-        total_days = 0
-        business_days = 0
-        weekend_days = 0
-        holiday_days = 0
-        holiday_list = []
-        
-        # 🔍 디버그: 각 날짜별 상세 로그
-        # print(f"🔍 === {year}년 {month}월 영업일 계산 시작 ===")
-        # print(f"기간: {start_date} ~ {end_date}")
-        
-        current_date = start_date
-        while current_date <= end_date:
-            total_days += 1
-            
-            day_type = ""
-            
-            # 주말 확인 (토요일=5, 일요일=6)
-            if current_date.weekday() >= 5:
-                weekend_days += 1
-                day_type = f"주말 (weekday={current_date.weekday()})"
-            # 공휴일 확인
-            elif current_date in self.kr_holidays:
-                holiday_days += 1
-                holiday_name = self.kr_holidays.get(current_date, '공휴일')
-                holiday_list.append({
-                    'date': current_date.strftime('%m-%d'),
-                    'name': holiday_name
-                })
-                day_type = f"공휴일 ({holiday_name})"
-            else:
-                business_days += 1
-                day_type = "영업일"
-            
-            # 각 날짜별 상세 로그
-            # print(f"  {current_date.strftime('%m-%d')} ({current_date.strftime('%A')}): {day_type}")
-            
-            current_date += datetime.timedelta(days=1)
-        
-        # 🔍 디버그: 최종 계산 결과
-        # print(f"🔍 === {year}년 {month}월 계산 완료 ===")
-        # print(f"  📊 총 일수: {total_days}일")
-        # print(f"  📅 주말: {weekend_days}일")  
-        # print(f"  🎌 공휴일: {holiday_days}일")
-        # print(f"  💼 영업일: {business_days}일")
-        # print(f"  🎌 공휴일 목록: {holiday_list}")
-        # print(f"🔍 ================================")
-        
-        return {
-            'year': year,
-            'month': month,
-            'total_days': total_days,
-            'business_days': business_days,
-            'weekend_days': weekend_days,
-            'holiday_days': holiday_days,
-            'holiday_list': holiday_list
-        }
+        """한국 공휴일을 고려한 영업일 수 계산 (공용 캘린더 조회)"""
+        return self.calendar.month_info(year, month)
     
     def calculate_business_days(self, df):
         """영업일 수 계산 (한국 공휴일 포함)"""
@@ -154,43 +120,60 @@ class DataProcessor:
             return []
     
     def process_uploaded_file(self, uploaded_file, session_mgr=None):
-        """업로드된 파일 처리"""
+        """업로드된 파일 처리 (같은 내용의 파일은 캐시된 결과 재사용)"""
         try:
+            # 업로드 내용 해시 기준 캐시 확인 (rerun 시 재파싱/재업로드 방지)
+            dataset_hash = self._get_upload_hash(uploaded_file)
+            ingest_cache = st.session_state.setdefault('ingest_cache', {})
+            cached = ingest_cache.get(dataset_hash)
+            if cached is not None:
+                # 최근 사용 순서 갱신 (LRU)
+                ingest_cache[dataset_hash] = ingest_cache.pop(dataset_hash)
+                return self._restore_cached_dataset(uploaded_file.name, cached, session_mgr)
+            
+            notices = []
             with st.spinner("📊 데이터를 처리하고 있습니다..."):
-                # CSV 파일 읽기
-                df = pd.read_csv(uploaded_file)
-                
-                # 컬럼명 정리
-                df.columns = df.columns.str.strip().str.lower().str.replace(" ", "")
+                # CSV 파일 읽기 (스키마 적용 + 청크 단위, 컬럼명 정리 포함)
+                df = read_billing_csv(uploaded_file)
                 
                 # 데이터 기본 정리
                 df = self._clean_data(df)
                 
-                # 세션 상태 업데이트
-                st.session_state.last_file = uploaded_file.name
-                st.session_state.last_dataframe = df.copy()
-                
-                # 영업일 수 미리 계산
-                self.calculate_business_days(df)
+                # dtype 압축 (정수/실수 축소, 반복 라벨은 카테고리형)
+                df, memory_report = compact_frame(df)
+                st.session_state.memory_report = memory_report
+                notices.append(("caption",
+                    f"🗜️ 메모리 최적화: {memory_report['before_bytes'] / 1024**2:,.1f}MB → "
+                    f"{memory_report['after_bytes'] / 1024**2:,.1f}MB ({memory_report['saved_ratio']:.0f}% 절감)"
+                ))
                 
-                # 세션 매니저가 있을 때만 호출
-                if session_mgr is not None:
-                    session_mgr.update_session_data(uploaded_file.name, df)
-                else:
-                    self._update_basic_session_data(uploaded_file.name, df)
+                # 세션 상태 업데이트 + 영업일 수 미리 계산
+                self._activate_dataset(uploaded_file.name, df, session_mgr)
                 
-                # ✅ Azure 업로드 기능 추가
-                from utils.azure_helper import AzureHelper
-                azure = AzureHelper()
+                # ✅ Azure 업로드 (백그라운드 대기열 - 분석은 업로드 완료를 기다리지 않음)
+                from utils.azure_helper import get_shared_azure_helper
+                from utils.upload_queue import get_upload_queue
+                from utils.session import get_browser_session_id
+                azure = get_shared_azure_helper()
                 if azure.connected:
-                    success, result = azure.upload_csv(df, uploaded_file.name)
-                    if success:
-                        st.info(f"☁️ Azure Blob에 저장됨: {uploaded_file.name}")
-                    else:
-                        st.warning(f"❌ Azure 업로드 실패: {result}")
+                    get_upload_queue().submit(
+                        uploaded_file.name, partial(azure.upload_dataframe, df, uploaded_file.name),
+                        owner=get_browser_session_id()
+                    )
+                    notices.append(("info", f"☁️ Azure 업로드 대기열에 추가됨: {uploaded_file.name} (진행 상태는 사이드바에서 확인)"))
                 else:
-                    st.warning("⚠️ Azure 연결 실패 - 환경변수 또는 네트워크 확인")
+                    notices.append(("warning", "⚠️ Azure 연결 실패 - 환경변수 또는 네트워크 확인"))
+                
+                # 결과 캐시 (최근 데이터셋 몇 개만 유지)
+                while len(ingest_cache) >= INGEST_CACHE_MAX_ENTRIES:
+                    ingest_cache.pop(next(iter(ingest_cache)))
+                ingest_cache[dataset_hash] = {
+                    "file": uploaded_file.name,
+                    "data": df,
+                    "notices": notices
+                }
                 
+            self._render_notices(notices)
             # st.success("✅ 데이터가 성공적으로 업로드되었습니다!")
             return df
             
@@ -198,6 +181,52 @@ class DataProcessor:
             st.error(f"❌ 파일 업로드 중 오류가 발생했습니다: {str(e)}")
             return None
     
+    def _get_upload_hash(self, uploaded_file):
+        """업로드 파일 내용 해시 (같은 업로드 위젯 값은 file_id로 재사용)"""
+        upload_hashes = st.session_state.setdefault('upload_hashes', {})
+        file_id = getattr(uploaded_file, 'file_id', None)
+        if file_id is not None and file_id in upload_hashes:
+            return upload_hashes[file_id]
+        
+        dataset_hash = content_hash(uploaded_file)
+        if file_id is not None:
+            upload_hashes.clear()
+            upload_hashes[file_id] = dataset_hash
+        return dataset_hash
+    
+    def _activate_dataset(self, filename, df, session_mgr=None):
+        """현재 데이터셋으로 지정 - 세션 상태, 영업일 수, 채팅 세션 데이터 갱신 (동일 프레임 공유 - 전체 복사 없음)"""
+        st.session_state.last_file = filename
+        st.session_state.last_dataframe = df
+        
+        # 영업일 수 미리 계산
+        self.calculate_business_days(df)
+        
+        # 세션 매니저가 있을 때만 호출
+        if session_mgr is not None:
+            session_mgr.update_session_data(filename, df)
+        else:
+            self._update_basic_session_data(filename, df)
+    
+    def _restore_cached_dataset(self, filename, cached, session_mgr=None):
+        """캐시된 데이터셋 복원 (파싱/Azure 업로드 생략, 다른 데이터셋에서 돌아온 경우만 세션 상태 갱신)"""
+        df = cached["data"]
+        if st.session_state.get('last_dataframe') is not df:
+            self._activate_dataset(filename, df, session_mgr)
+        st.session_state.last_file = filename
+        
+        # 파생 지표도 함께 복원
+        if "metrics" in cached:
+            st.session_state.derived_metrics_cache = {'source': df, 'metrics': cached["metrics"]}
+        
+        self._render_notices(cached["notices"])
+        return df
+    
+    def _render_notices(self, notices):
+        """처리 결과 메시지 표시"""
+        for level, message in notices:
+            getattr(st, level)(message)
+    
     def _update_basic_session_data(self, filename, dataframe):
         """기본 세션 데이터 업데이트 (session_mgr 없이)"""
         try:
@@ -228,66 +257,203 @@ class DataProcessor:
     
     def _clean_data(self, df):
         """데이터 정리"""
-        df = df.dropna(how='all')
+        # 전부 비어있는 행이 있을 때만 제거 (불필요한 전체 복사 방지)
+        empty_rows = df.isna().all(axis=1)
+        if empty_rows.any():
+            df = df[~empty_rows].reset_index(drop=True)
         
         numeric_columns = ["m1요청금액", "m2요청금액", "m1월회선수", "m2월회선수", "m1청구금액", "m2청구금액"]
         for col in numeric_columns:
-            if col in df.columns:
+            if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
                 df[col] = pd.to_numeric(df[col], errors='coerce')
         
+        # 기준월은 수집 시점에 한 번만 날짜형으로 변환
+        if '기준월' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['기준월']):
+            df['기준월'] = pd.to_datetime(df['기준월'], errors='coerce')
+        
         return df
     
+    def _cached_metrics(self, df):
+        """원본 프레임에 대해 캐시된 파생 지표 (없으면 None)"""
+        cache = st.session_state.get('derived_metrics_cache')
+        if cache is not None and cache['source'] is df:
+            return cache['metrics']
+        return None
+    
+    def _store_metrics(self, df, metrics):
+        """원본 프레임 객체 기준으로 파생 지표 캐시 (임계값 변경 시 재사용)"""
+        st.session_state.derived_metrics_cache = {'source': df, 'metrics': metrics}
+        for cached in st.session_state.get('ingest_cache', {}).values():
+            if cached["data"] is df:
+                cached["metrics"] = metrics
+    
+    def _coerce_numeric(self, df):
+        """이상 탐지용 사본 생성 + 숫자형 변환"""
+        metrics = df.copy()
+        for col in ANOMALY_NUMERIC_COLUMNS:
+            if col in metrics.columns:
+                metrics[col] = pd.to_numeric(metrics[col], errors='coerce')
+        return metrics
+    
+    def get_derived_metrics(self, df):
+        """임계값과 무관한 파생 지표 (숫자 변환, ARPU, 변화율) - 데이터셋별 1회 계산 후 캐시"""
+        metrics = self._cached_metrics(df)
+        if metrics is not None:
+            return metrics
+        
+        metrics = self._coerce_numeric(df)
+
+        # ARPU / 청구금액 변화율 / 회선수 변화율 계산 (컬럼 단위 연산)
+        arpu, amount_rate, lines_rate = compute_change_metrics(
+            metrics["m1청구금액"], metrics["m2청구금액"],
+            metrics["m1월회선수"], metrics["m2월회선수"]
+        )
+        metrics["arpu"] = arpu
+        metrics["청구금액_변화율"] = amount_rate
+        metrics["회선수_변화율"] = lines_rate
+        
+        self._store_metrics(df, metrics)
+        return metrics
+    
+    def get_robust_scores(self, df, metrics):
+        """그룹(lob, 요금유형코드)별 로버스트 Z 점수 - 데이터셋별 1회 계산 후 캐시
+
+        반환: (청구금액 Z, 회선수 Z, 이상 점수 = 두 Z 절댓값 중 큰 값)
+        """
+        cache = st.session_state.get('derived_metrics_cache')
+        if cache is not None and cache['source'] is df and 'robust' in cache:
+            return cache['robust']
+        
+        group_keys = [col for col in ROBUST_GROUP_KEYS if col in metrics.columns]
+        if group_keys:
+            group_codes = metrics.groupby(group_keys, sort=False, observed=True, dropna=False).ngroup().to_numpy()
+        else:
+            group_codes = np.zeros(len(metrics), dtype="int64")
+        
+        z_amount = robust_z_scores(metrics["청구금액_변화율"], group_codes)
+        z_lines = robust_z_scores(metrics["회선수_변화율"], group_codes)
+        score = np.fmax(np.abs(z_amount), np.abs(z_lines))
+        
+        robust = (z_amount, z_lines, score)
+        if cache is not None and cache['source'] is df:
+            cache['robust'] = robust
+        return robust
+    
+    def _profile_positions(self, df):
+        """행별 임계값 프로필 위치 (해당 프로필 없음 = -1) - 데이터셋별 1회 계산 후 캐시"""
+        key = self.threshold_profiles["key"]
+        profiles = self.threshold_profiles["profiles"]
+        if not profiles or key not in df.columns:
+            return None
+        
+        cache = st.session_state.get('derived_metrics_cache')
+        cache_key = ('profile_positions', key, tuple(profiles))
+        if cache is not None and cache['source'] is df and cache_key in cache:
+            return cache[cache_key]
+        
+        profile_index = pd.Index(list(profiles))
+        values = df[key]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # 카테고리형은 카테고리 목록만 조회 후 코드로 펼침
+            category_positions = profile_index.get_indexer(values.cat.categories)
+            codes = values.cat.codes.to_numpy()
+            positions = np.where(codes >= 0, category_positions[codes], -1)
+        else:
+            positions = profile_index.get_indexer(values)
+        
+        if cache is not None and cache['source'] is df:
+            cache[cache_key] = positions
+        return positions
+    
+    def _resolve_thresholds(self, df):
+        """적용할 임계값 (min_amount, min_lines, change_threshold)
+        
+        프로필이 없으면 화면 입력값(스칼라), 있으면 그룹 키 → 임계값 표 조회로 만든 행별 배열
+        """
+        defaults = [self.min_amount, self.min_lines, self.change_threshold]
+        positions = self._profile_positions(df)
+        if positions is None:
+            return tuple(defaults)
+        
+        # 마지막 행 = 화면 입력값 (프로필이 없는 그룹의 위치 -1이 가리킴)
+        table = np.array(
+            [
+                [profile.get(field, default) for field, default in zip(THRESHOLD_PROFILE_FIELDS, defaults)]
+                for profile in self.threshold_profiles["profiles"].values()
+            ] + [defaults],
+            dtype="float64"
+        )
+        limits = table.T[:, positions]
+        return limits[0], limits[1], limits[2]
+    
+    def _use_parallel_detection(self, df):
+        """병렬 탐지 사용 여부 (임계값 모드 + 대용량 + 파생 지표 캐시 없음)"""
+        return (
+            self.detection_mode == "threshold"
+            and self.parallel_workers > 1
+            and len(df) >= PARALLEL_DETECTION_MIN_ROWS
+            and self._cached_metrics(df) is None
+        )
+    
+    def _detect_parallel(self, df, thresholds):
+        """월/LOB 파티션 병렬 탐지 - (파생 지표 프레임, 탐지 조건) 반환"""
+        metrics = self._coerce_numeric(df)
+        partition_keys = [col for col in PARALLEL_PARTITION_KEYS if col in metrics.columns]
+        min_amount, min_lines, change_threshold = thresholds
+        
+        arpu, amount_rate, lines_rate, flagged_rows = detect_partitioned(
+            metrics, partition_keys,
+            min_amount, min_lines, change_threshold,
+            self.parallel_workers
+        )
+        metrics["arpu"] = arpu
+        metrics["청구금액_변화율"] = amount_rate
+        metrics["회선수_변화율"] = lines_rate
+        self._store_metrics(df, metrics)
+        
+        final_condition = np.zeros(len(metrics), dtype=bool)
+        final_condition[flagged_rows] = True
+        return metrics, final_condition
+    
     def detect_anomalies(self, df):
-        """이상 패턴 탐지 (상세 정보 포함)"""
+        """이상 패턴 탐지 (상세 정보 포함) - 캐시된 파생 지표에 임계값 조건만 다시 적용"""
         try:
-            df_filtered = df.copy()
-            
-            # 숫자형 변환
-            for col in ["m1요청금액", "m2요청금액", "m1월회선수", "m2월회선수", "m1청구금액", "m2청구금액"]:
-                if col in df_filtered.columns:
-                    df_filtered[col] = pd.to_numeric(df_filtered[col], errors='coerce')
-
-            # ARPU 계산
-            df_filtered["arpu"] = df_filtered.apply(
-                lambda row: row["m1청구금액"] / row["m1월회선수"] 
-                if row["m1월회선수"] > 0 else 0, axis=1
-            )
+            # 임계값 (그룹별 프로필이 있으면 행별 배열)
+            thresholds = self._resolve_thresholds(df)
+            min_amount, min_lines, change_threshold = thresholds
             
-            # 청구금액 변화율 계산
-            df_filtered["청구금액_변화율"] = df_filtered.apply(
-                lambda row: ((row["m1청구금액"] - row["m2청구금액"]) / row["m2청구금액"] * 100) 
-                if row["m2청구금액"] > 0 else 0, axis=1
-            )
+            if self._use_parallel_detection(df):
+                df_filtered, final_condition = self._detect_parallel(df, thresholds)
+            else:
+                df_filtered = self.get_derived_metrics(df)
+                final_condition = None
             
-            # 회선수 변화율 계산
-            df_filtered["회선수_변화율"] = df_filtered.apply(
-                lambda row: ((row["m1월회선수"] - row["m2월회선수"]) / row["m2월회선수"] * 100) 
-                if row["m2월회선수"] > 0 else 0, axis=1
-            )
+            arpu = df_filtered["arpu"].to_numpy()
+            amount_rate = df_filtered["청구금액_변화율"].to_numpy()
+            lines_rate = df_filtered["회선수_변화율"].to_numpy()
 
+            # 그룹 통계 모드: 변화율 대신 그룹 내 로버스트 Z 점수로 판정
+            if self.detection_mode == "robust":
+                return self._flag_robust(df, df_filtered, arpu, min_amount, min_lines)
+            
             # 이상 데이터 필터링 조건
-            conditions = [
-                ((df_filtered["m1월회선수"] + df_filtered["m2월회선수"]) > 0),
-                ((df_filtered["m1요청금액"] >= self.min_amount) | (df_filtered["m2요청금액"] >= self.min_amount)),
-                (df_filtered["m1월회선수"] > self.min_lines),
-                (df_filtered["arpu"] >= 0.1),
-                (abs(df_filtered["청구금액_변화율"]) >= self.change_threshold),
-                (abs(df_filtered["회선수_변화율"]) >= self.change_threshold)
-            ]
+            if final_condition is None:
+                final_condition = build_anomaly_mask(
+                    df_filtered["m1요청금액"], df_filtered["m2요청금액"],
+                    df_filtered["m1월회선수"], df_filtered["m2월회선수"],
+                    arpu, amount_rate, lines_rate,
+                    min_amount, min_lines, change_threshold
+                )
+            df_flagged = df_filtered[final_condition].copy()
             
-            if conditions:
-                final_condition = conditions[0]
-                for condition in conditions[1:]:
-                    final_condition = final_condition & condition
-                    
-                df_flagged = df_filtered[final_condition].copy()
-                
-                # 이상 유형 분류
-                if len(df_flagged) > 0:
-                    df_flagged["이상_유형"] = df_flagged.apply(self._classify_anomaly_type, axis=1)
-                    
-            else:
-                df_flagged = pd.DataFrame()
+            # 이상 유형 분류 (탐지된 행만)
+            if len(df_flagged) > 0:
+                df_flagged["이상_유형"] = classify_anomaly_types(
+                    amount_rate[final_condition], lines_rate[final_condition],
+                    df_flagged["m1요청금액"], arpu[final_condition],
+                    np.broadcast_to(min_amount, arpu.shape)[final_condition],
+                    np.broadcast_to(change_threshold, arpu.shape)[final_condition]
+                )
             
             return df_flagged
             
@@ -295,31 +461,27 @@ class DataProcessor:
             st.error(f"이상 탐지 중 오류: {str(e)}")
             return pd.DataFrame()
     
-    def _classify_anomaly_type(self, row):
-        """이상 유형 분류"""
-        types = []
-        
-        if abs(row["청구금액_변화율"]) >= self.change_threshold:
-            if row["청구금액_변화율"] > 0:
-                types.append("청구금액 급증")
-            else:
-                types.append("청구금액 급감")
-        
-        if abs(row["회선수_변화율"]) >= self.change_threshold:
-            if row["회선수_변화율"] > 0:
-                types.append("회선수 급증")
-            else:
-                types.append("회선수 급감")
-        
-        if row["m1요청금액"] >= self.min_amount:
-            types.append("고액 요청")
-        
-        if row["arpu"] < 1000:  # ARPU가 너무 낮은 경우
-            types.append("저ARPU")
-        elif row["arpu"] > 50000:  # ARPU가 너무 높은 경우
-            types.append("고ARPU")
+    def _flag_robust(self, df, df_filtered, arpu, min_amount, min_lines):
+        """로버스트 Z 점수 기준 이상 항목 추출 + 유형/점수 컬럼 추가"""
+        z_amount, z_lines, score = self.get_robust_scores(df, df_filtered)
+        final_condition = build_robust_mask(
+            df_filtered["m1요청금액"], df_filtered["m2요청금액"],
+            df_filtered["m1월회선수"], df_filtered["m2월회선수"],
+            arpu, score,
+            min_amount, min_lines, self.z_threshold
+        )
+        df_flagged = df_filtered[final_condition].copy()
         
-        return " / ".join(types) if types else "기타"
+        if len(df_flagged) > 0:
+            df_flagged["이상_유형"] = classify_anomaly_types(
+                z_amount[final_condition], z_lines[final_condition],
+                df_flagged["m1요청금액"], arpu[final_condition],
+                np.broadcast_to(min_amount, arpu.shape)[final_condition], self.z_threshold
+            )
+        df_flagged["청구금액_z"] = z_amount[final_condition]
+        df_flagged["회선수_z"] = z_lines[final_condition]
+        df_flagged["이상_점수"] = score[final_condition]
+        return df_flagged
     
     def get_anomaly_summary(self, df_flagged):
         """이상 항목 요약 정보"""
@@ -338,62 +500,61 @@ class DataProcessor:
         return summary
     
     def get_business_days_impact_analysis(self, df, df_flagged):
-        """영업일 수 변화가 청구금액에 미치는 영향 분석"""
+        """영업일 수 변화가 청구금액에 미치는 영향 분석 (월 키 1회 계산 + 월별 groupby 집계)"""
         try:
-            biz_days_info = st.session_state.get('detailed_biz_days', {})
-            
             analysis = {
                 "영업일_변화_요약": [],
                 "청구금액_대비_영업일_효율성": [],
                 "이상항목_영업일_연관성": ""
             }
             
-            # 영업일 변화 분석
-            months = sorted(biz_days_info.keys())
-            for i, month in enumerate(months):
-                biz_info = biz_days_info[month]
+            # 월 키는 한 번만 계산 (Period)
+            month_key = pd.to_datetime(df['기준월'], errors='coerce').dt.to_period('M')
+            avg_billing = pd.to_numeric(df['m1청구금액'], errors='coerce').groupby(month_key, sort=False).mean()
+            
+            # 세션에 계산된 월별 영업일 (Period 키)
+            biz_by_period = {
+                pd.Period(ym_str, freq='M'): info
+                for ym_str, info in st.session_state.get('detailed_biz_days', {}).items()
+            }
+            
+            # 영업일 변화 분석 (월 순서대로, 바로 이전 달과 비교 - 이전 달 정보가 없으면 건너뜀)
+            for period in sorted(biz_by_period):
+                prev_info = biz_by_period.get(period - 1)
+                if prev_info is None or period not in avg_billing.index:
+                    continue
+                biz_info = biz_by_period[period]
+                prev_days = prev_info['business_days']
+                biz_change = biz_info['business_days'] - prev_days
+                biz_change_pct = (biz_change / prev_days * 100) if prev_days > 0 else 0
                 
-                if i > 0:
-                    prev_month = months[i-1]
-                    prev_biz_info = biz_days_info[prev_month]
-                    
-                    biz_change = biz_info['business_days'] - prev_biz_info['business_days']
-                    biz_change_pct = (biz_change / prev_biz_info['business_days'] * 100) if prev_biz_info['business_days'] > 0 else 0
-                    
-                    # 해당 월의 청구금액 변화
-                    month_data = df[df['기준월'].dt.strftime('%Y-%m') == month]
-                    if len(month_data) > 0:
-                        avg_billing = month_data['m1청구금액'].mean()
-                        
-                        analysis["영업일_변화_요약"].append({
-                            "월": month,
-                            "영업일_변화": biz_change,
-                            "영업일_변화율": biz_change_pct,
-                            "공휴일_수": biz_info['holiday_days'],
-                            "공휴일_목록": [h['name'] for h in biz_info['holiday_list']],
-                            "평균_청구금액": avg_billing
-                        })
+                analysis["영업일_변화_요약"].append({
+                    "월": period.strftime('%Y-%m'),
+                    "영업일_변화": biz_change,
+                    "영업일_변화율": biz_change_pct,
+                    "공휴일_수": biz_info['holiday_days'],
+                    "공휴일_목록": [h['name'] for h in biz_info['holiday_list']],
+                    "평균_청구금액": avg_billing[period]
+                })
             
-            # 이상항목과 영업일 연관성 분석
+            # 이상항목과 영업일 연관성 분석 (월별 이상 건수 1회 집계)
             if len(df_flagged) > 0:
-                flagged_months = df_flagged['기준월'].dt.strftime('%Y-%m').unique()
-                high_anomaly_months = []
-                
-                for month in flagged_months:
-                    month_anomalies = len(df_flagged[df_flagged['기준월'].dt.strftime('%Y-%m') == month])
-                    if month in biz_days_info:
-                        biz_info = biz_days_info[month]
-                        high_anomaly_months.append({
-                            "월": month,
-                            "이상항목_수": month_anomalies,
-                            "영업일_수": biz_info['business_days'],
-                            "공휴일_수": biz_info['holiday_days']
-                        })
+                flagged_key = pd.to_datetime(df_flagged['기준월'], errors='coerce').dt.to_period('M')
+                anomaly_counts = flagged_key.groupby(flagged_key, sort=False).size()
                 
-                analysis["이상항목_영업일_연관성"] = high_anomaly_months
+                analysis["이상항목_영업일_연관성"] = [
+                    {
+                        "월": period.strftime('%Y-%m'),
+                        "이상항목_수": int(count),
+                        "영업일_수": biz_by_period[period]['business_days'],
+                        "공휴일_수": biz_by_period[period]['holiday_days']
+                    }
+                    for period, count in anomaly_counts.items()
+                    if period in biz_by_period
+                ]
             
             return analysis
             
         except Exception as e:
             st.error(f"영업일 영향 분석 중 오류: {str(e)}")
-            return {}
\ No newline at end of file
+            return {}
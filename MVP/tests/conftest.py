@@ -0,0 +1,49 @@
+# tests/conftest.py
+# 테스트 공용 설정 - MVP 디렉터리를 import 경로에 추가하고 세션 상태/샘플 청구 데이터 제공
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+import streamlit as st
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def clear_session_state():
+    """테스트마다 Streamlit 세션 상태 초기화 (bare 모드에서는 프로세스 공용 dict)"""
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+    yield
+
+
+def make_billing_frame(n_rows=2000, seed=0, months=("2025-04-01", "2025-05-01", "2025-06-01")):
+    """샘플 청구 프레임 (0/결측/급증·급감 값이 섞인 무작위 데이터)"""
+    rng = np.random.default_rng(seed)
+    m2_lines = rng.integers(0, 400, n_rows).astype("float64")
+    m1_lines = m2_lines * rng.choice([0.2, 0.9, 1.0, 1.1, 3.0], n_rows)
+    # 금액은 원 단위 정수
+    m2_amount = np.round(m2_lines * rng.uniform(500, 80000, n_rows))
+    m1_amount = np.round(m2_amount * rng.choice([0.1, 0.95, 1.0, 1.05, 4.0], n_rows))
+    df = pd.DataFrame({
+        "기준월": pd.to_datetime(rng.choice(months, n_rows)),
+        "lob": rng.choice(["무선", "유선", "IoT"], n_rows),
+        "요금유형코드": rng.choice(["A", "B"], n_rows),
+        "청구항목명": [f"서비스{i % 97}" for i in range(n_rows)],
+        "m1요청금액": np.round(m1_amount * rng.uniform(0.9, 1.1, n_rows)),
+        "m2요청금액": np.round(m2_amount * rng.uniform(0.9, 1.1, n_rows)),
+        "m1월회선수": np.round(m1_lines),
+        "m2월회선수": m2_lines,
+        "m1청구금액": m1_amount,
+        "m2청구금액": m2_amount,
+    })
+    # 결측값 일부
+    for col in ["m1청구금액", "m2월회선수", "m1요청금액"]:
+        df.loc[rng.random(n_rows) < 0.02, col] = np.nan
+    return df
+
+
+@pytest.fixture
+def billing_frame():
+    return make_billing_frame()
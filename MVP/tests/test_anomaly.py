@@ -0,0 +1,76 @@
+# tests/test_anomaly.py
+# 벡터화 이상 탐지 엔진 - 기존 행 단위(apply) 구현과 결과가 동일한지 확인
+import pandas as pd
+import pytest
+from data.processor import DataProcessor
+
+
+def _classify_row(row, min_amount, change_threshold):
+    """기존 행 단위 이상 유형 분류"""
+    types = []
+    if abs(row["청구금액_변화율"]) >= change_threshold:
+        types.append("청구금액 급증" if row["청구금액_변화율"] > 0 else "청구금액 급감")
+    if abs(row["회선수_변화율"]) >= change_threshold:
+        types.append("회선수 급증" if row["회선수_변화율"] > 0 else "회선수 급감")
+    if row["m1요청금액"] >= min_amount:
+        types.append("고액 요청")
+    if row["arpu"] < 1000:
+        types.append("저ARPU")
+    elif row["arpu"] > 50000:
+        types.append("고ARPU")
+    return " / ".join(types) if types else "기타"
+
+
+def detect_row_wise(df, min_amount, min_lines, change_threshold):
+    """기존 행 단위(apply) 이상 탐지 구현"""
+    df_filtered = df.copy()
+    df_filtered["arpu"] = df_filtered.apply(
+        lambda row: row["m1청구금액"] / row["m1월회선수"] if row["m1월회선수"] > 0 else 0, axis=1
+    )
+    df_filtered["청구금액_변화율"] = df_filtered.apply(
+        lambda row: ((row["m1청구금액"] - row["m2청구금액"]) / row["m2청구금액"] * 100)
+        if row["m2청구금액"] > 0 else 0, axis=1
+    )
+    df_filtered["회선수_변화율"] = df_filtered.apply(
+        lambda row: ((row["m1월회선수"] - row["m2월회선수"]) / row["m2월회선수"] * 100)
+        if row["m2월회선수"] > 0 else 0, axis=1
+    )
+    final_condition = (
+        ((df_filtered["m1월회선수"] + df_filtered["m2월회선수"]) > 0)
+        & ((df_filtered["m1요청금액"] >= min_amount) | (df_filtered["m2요청금액"] >= min_amount))
+        & (df_filtered["m1월회선수"] > min_lines)
+        & (df_filtered["arpu"] >= 0.1)
+        & (abs(df_filtered["청구금액_변화율"]) >= change_threshold)
+        & (abs(df_filtered["회선수_변화율"]) >= change_threshold)
+    )
+    df_flagged = df_filtered[final_condition].copy()
+    if len(df_flagged) > 0:
+        df_flagged["이상_유형"] = df_flagged.apply(_classify_row, axis=1, args=(min_amount, change_threshold))
+    return df_flagged
+
+
+@pytest.mark.parametrize("min_amount, min_lines, change_threshold", [
+    (1_000_000, 10, 20),
+    (100_000, 0, 5),
+    (50_000_000, 100, 50),
+])
+def test_vectorized_matches_row_wise(billing_frame, min_amount, min_lines, change_threshold):
+    processor = DataProcessor()
+    processor.update_thresholds(min_amount, min_lines, change_threshold)
+
+    expected = detect_row_wise(billing_frame, min_amount, min_lines, change_threshold)
+    result = processor.detect_anomalies(billing_frame)
+
+    assert len(expected) > 0
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_threshold_change_reuses_cached_metrics(billing_frame):
+    """임계값만 바꾼 재탐지도 처음부터 계산한 결과와 동일"""
+    processor = DataProcessor()
+    processor.detect_anomalies(billing_frame)
+
+    processor.update_thresholds(100_000, 0, 5)
+    result = processor.detect_anomalies(billing_frame)
+
+    pd.testing.assert_frame_equal(result, detect_row_wise(billing_frame, 100_000, 0, 5))
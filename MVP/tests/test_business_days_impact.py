@@ -0,0 +1,75 @@
+# tests/test_business_days_impact.py
+# 영업일 영향 분석 - 월 단위 집계 결과가 기존 구현과 같고, 빠진 달은 이전 달로 건너뛰지 않는지 확인
+import numpy as np
+import streamlit as st
+from data.processor import DataProcessor
+from tests.conftest import make_billing_frame
+
+
+def impact_month_loop(df, df_flagged, biz_days_info):
+    """기존 구현 (월마다 전체 프레임 필터링)"""
+    analysis = {"영업일_변화_요약": [], "이상항목_영업일_연관성": ""}
+    months = sorted(biz_days_info.keys())
+    for i, month in enumerate(months):
+        if i == 0:
+            continue
+        biz_info = biz_days_info[month]
+        prev_days = biz_days_info[months[i - 1]]['business_days']
+        biz_change = biz_info['business_days'] - prev_days
+        month_data = df[df['기준월'].dt.strftime('%Y-%m') == month]
+        if len(month_data) > 0:
+            analysis["영업일_변화_요약"].append({
+                "월": month,
+                "영업일_변화": biz_change,
+                "영업일_변화율": (biz_change / prev_days * 100) if prev_days > 0 else 0,
+                "공휴일_수": biz_info['holiday_days'],
+                "공휴일_목록": [h['name'] for h in biz_info['holiday_list']],
+                "평균_청구금액": month_data['m1청구금액'].mean()
+            })
+    if len(df_flagged) > 0:
+        rows = []
+        for month in df_flagged['기준월'].dt.strftime('%Y-%m').unique():
+            if month in biz_days_info:
+                rows.append({
+                    "월": month,
+                    "이상항목_수": int((df_flagged['기준월'].dt.strftime('%Y-%m') == month).sum()),
+                    "영업일_수": biz_days_info[month]['business_days'],
+                    "공휴일_수": biz_days_info[month]['holiday_days']
+                })
+        analysis["이상항목_영업일_연관성"] = rows
+    return analysis
+
+
+def test_matches_month_loop(billing_frame):
+    processor = DataProcessor()
+    processor.calculate_business_days(billing_frame)
+    df_flagged = processor.detect_anomalies(billing_frame)
+
+    result = processor.get_business_days_impact_analysis(billing_frame, df_flagged)
+    expected = impact_month_loop(billing_frame, df_flagged, st.session_state.detailed_biz_days)
+
+    assert [(row["월"], row["영업일_변화"]) for row in result["영업일_변화_요약"]] == [("2025-05", -2), ("2025-06", -1)]
+    assert len(result["영업일_변화_요약"]) == len(expected["영업일_변화_요약"])
+    for row, expected_row in zip(result["영업일_변화_요약"], expected["영업일_변화_요약"]):
+        assert row.pop("평균_청구금액") == expected_row.pop("평균_청구금액")
+        assert row == expected_row
+    assert result["이상항목_영업일_연관성"] == expected["이상항목_영업일_연관성"]
+
+
+def test_month_gap_is_not_compared():
+    """세션에 빠진 달이 있으면 그 다음 달은 몇 달 전과 비교하지 않고 건너뜀"""
+    processor = DataProcessor()
+    processor.calculate_business_days(make_billing_frame(n_rows=50, months=("2025-01-01",)))
+    df = make_billing_frame(n_rows=200, months=("2025-01-01", "2025-05-01", "2025-06-01"))
+    processor.calculate_business_days(df.copy())
+
+    result = processor.get_business_days_impact_analysis(df, df.iloc[:0])
+    months = [row["월"] for row in result["영업일_변화_요약"]]
+
+    assert sorted(st.session_state.detailed_biz_days) == ["2024-11", "2024-12", "2025-01", "2025-04", "2025-05", "2025-06"]
+    # 2025-01은 2024-12와 비교, 2025-05는 2025-04와 비교 (데이터에 없는 달은 결과에서 제외)
+    assert months == ["2025-01", "2025-05", "2025-06"]
+    row = result["영업일_변화_요약"][1]
+    info = st.session_state.detailed_biz_days
+    assert row["영업일_변화"] == info["2025-05"]["business_days"] - info["2025-04"]["business_days"]
+    assert np.isclose(row["평균_청구금액"], df.loc[df["기준월"] == "2025-05-01", "m1청구금액"].mean())
@@ -0,0 +1,54 @@
+# tests/test_calendar.py
+# 영업일 캘린더 - 사전 계산 테이블이 날짜별 직접 계산과 같은지 확인
+import datetime
+import calendar
+import numpy as np
+import holidays
+import pytest
+from data.calendar import KoreanBusinessCalendar
+
+
+def count_month_naive(year, month):
+    """날짜를 하나씩 확인하는 기존 방식 (주말/공휴일 제외)"""
+    kr_holidays = holidays.KR(years=year)
+    business = weekend = holiday = 0
+    for day in range(1, calendar.monthrange(year, month)[1] + 1):
+        date = datetime.date(year, month, day)
+        if date.weekday() >= 5:
+            weekend += 1
+        elif date in kr_holidays:
+            holiday += 1
+        else:
+            business += 1
+    return business, weekend, holiday
+
+
+@pytest.mark.parametrize("year", [2024, 2025, 2026])
+def test_month_info_matches_naive_count(year):
+    cal = KoreanBusinessCalendar()
+    for month in range(1, 13):
+        info = cal.month_info(year, month)
+        assert (info["business_days"], info["weekend_days"], info["holiday_days"]) == count_month_naive(year, month)
+        assert info["total_days"] == calendar.monthrange(year, month)[1]
+        assert len(info["holiday_list"]) == info["holiday_days"]
+
+
+def test_busday_count_matches_naive_count():
+    cal = KoreanBusinessCalendar()
+    begin = np.array(["2024-12-20", "2025-01-01", "2025-09-30"], dtype="datetime64[D]")
+    end = np.array(["2025-01-10", "2025-03-01", "2025-10-15"], dtype="datetime64[D]")
+
+    expected = []
+    for first, last in zip(begin.tolist(), end.tolist()):
+        kr_holidays = holidays.KR(years=[first.year, last.year])
+        days = [first + datetime.timedelta(days=i) for i in range((last - first).days)]
+        expected.append(sum(1 for d in days if d.weekday() < 5 and d not in kr_holidays))
+
+    assert cal.busday_count(begin, end).tolist() == expected
+
+
+def test_month_info_returns_copy():
+    """반환된 공휴일 목록을 수정해도 캐시된 테이블은 그대로"""
+    cal = KoreanBusinessCalendar()
+    cal.month_info(2025, 10)["holiday_list"].clear()
+    assert cal.holiday_list(2025, 10)
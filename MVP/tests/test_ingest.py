@@ -0,0 +1,73 @@
+# tests/test_ingest.py
+# 청구 CSV 수집 - pyarrow 블록 파싱과 pandas 청크 읽기 결과가 같은지 확인
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from data import ingest
+from data.ingest import read_billing_csv, normalize_columns, build_schema, compact_frame
+from tests.conftest import make_billing_frame
+
+
+def _csv_source(df):
+    """원본 업로드와 같은 형태의 CSV 버퍼 (헤더에 대문자/공백 포함)"""
+    df = df.rename(columns={"lob": " LOB ", "m1청구금액": "M1 청구금액"})
+    return io.BytesIO(df.to_csv(index=False).encode("utf-8"))
+
+
+def _read_both(source):
+    columns = normalize_columns(ingest._read_header(source))
+    schema = build_schema(columns)
+    arrow_frame = ingest._read_with_pyarrow(source, columns, schema)
+    source.seek(0)
+    pandas_frame = ingest._read_with_pandas_chunks(source, columns, schema)
+    return arrow_frame, pandas_frame
+
+
+@pytest.fixture
+def csv_source():
+    return _csv_source(make_billing_frame(n_rows=3000, seed=1))
+
+
+def test_pyarrow_matches_pandas_chunks(csv_source, monkeypatch):
+    # 청크 여러 개로 나뉘도록 청크 크기 축소
+    monkeypatch.setattr(ingest, "CSV_CHUNK_ROWS", 700)
+    arrow_frame, pandas_frame = _read_both(csv_source)
+
+    pd.testing.assert_frame_equal(arrow_frame, pandas_frame, check_dtype=False)
+    for col, dtype in build_schema(arrow_frame.columns).items():
+        if dtype == "float64":
+            assert arrow_frame[col].dtype == "float64"
+            assert pandas_frame[col].dtype == "float64"
+
+
+def test_read_billing_csv_matches_plain_read_csv(csv_source):
+    """기존 방식 (read_csv + 컬럼명 정리 + 숫자 변환)과 값이 동일"""
+    expected = pd.read_csv(csv_source)
+    csv_source.seek(0)
+    expected.columns = expected.columns.str.strip().str.lower().str.replace(" ", "")
+
+    result = read_billing_csv(csv_source)
+
+    assert list(result.columns) == list(expected.columns)
+    for col in ["m1요청금액", "m2요청금액", "m1월회선수", "m2월회선수", "m1청구금액", "m2청구금액"]:
+        np.testing.assert_array_equal(result[col].to_numpy(), pd.to_numeric(expected[col], errors="coerce").to_numpy())
+    assert result["lob"].tolist() == expected["lob"].tolist()
+
+
+def test_mixed_numeric_column_falls_back_to_pandas():
+    """숫자 컬럼에 문자열이 섞이면 pandas 경로로 다시 읽고 해당 값은 결측 처리"""
+    source = io.BytesIO("lob,m1청구금액\n무선,100\n유선,N/A-\n".encode("utf-8"))
+    result = read_billing_csv(source)
+
+    assert result["m1청구금액"].dtype == "float64"
+    assert result["m1청구금액"].iloc[0] == 100
+    assert np.isnan(result["m1청구금액"].iloc[1])
+
+
+def test_compact_frame_keeps_values(billing_frame):
+    expected = billing_frame.copy()
+    compacted, report = compact_frame(billing_frame.copy())
+
+    assert report["after_bytes"] <= report["before_bytes"]
+    pd.testing.assert_frame_equal(compacted, expected, check_dtype=False, check_categorical=False)
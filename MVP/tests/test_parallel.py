@@ -0,0 +1,52 @@
+# tests/test_parallel.py
+# 월/LOB 파티션 병렬 탐지 - 단일 프로세스 탐지와 결과가 같은지 확인
+import pandas as pd
+import pytest
+import streamlit as st
+from data import processor as processor_module
+from data.processor import DataProcessor
+from data.parallel import _build_tasks
+from tests.conftest import make_billing_frame
+
+
+def _detect(df, workers, profiles=None):
+    st.session_state.pop('derived_metrics_cache', None)
+    processor = DataProcessor()
+    processor.parallel_workers = workers
+    if profiles is not None:
+        processor.threshold_profiles = profiles
+    processor.update_thresholds(500_000, 5, 15)
+    assert processor._use_parallel_detection(df) == (workers > 1)
+    return processor.detect_anomalies(df)
+
+
+@pytest.fixture
+def large_frame(monkeypatch):
+    monkeypatch.setattr(processor_module, "PARALLEL_DETECTION_MIN_ROWS", 1000)
+    return make_billing_frame(n_rows=20_000, seed=3)
+
+
+def test_parallel_matches_serial(large_frame):
+    serial = _detect(large_frame, 1)
+    parallel = _detect(large_frame, 4)
+
+    assert len(serial) > 0
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_parallel_matches_serial_with_profiles(large_frame):
+    profiles = {"key": "lob", "profiles": {"무선": {"min_amount": 2_000_000}, "IoT": {"change_threshold": 40, "min_lines": 0}}}
+    serial = _detect(large_frame, 1, profiles)
+    parallel = _detect(large_frame, 3, profiles)
+
+    assert len(serial) > 0
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_build_tasks_covers_every_row_once():
+    group_codes = make_billing_frame(n_rows=5000, seed=4).groupby(["기준월", "lob"]).ngroup().to_numpy()
+    order, tasks = _build_tasks(group_codes, workers=4)
+
+    rows = [row for start, stop in tasks for row in order[start:stop]]
+    assert sorted(rows) == list(range(len(group_codes)))
+    assert [start for start, _ in tasks[1:]] == [stop for _, stop in tasks[:-1]]
@@ -0,0 +1,84 @@
+# tests/test_processor_cache.py
+# 업로드 내용 해시 캐시 - 같은 파일은 다시 파싱하지 않고 캐시된 데이터셋을 복원
+import io
+import types
+import pytest
+import streamlit as st
+from data import processor as processor_module
+from data.processor import DataProcessor
+from tests.conftest import make_billing_frame
+
+
+class FakeUpload(io.BytesIO):
+    """Streamlit UploadedFile 대용 (name, file_id 속성)"""
+
+    def __init__(self, content, name, file_id):
+        super().__init__(content)
+        self.name = name
+        self.file_id = file_id
+
+
+def _upload(df, name, file_id):
+    return FakeUpload(df.to_csv(index=False).encode("utf-8"), name, file_id)
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    # Azure 연결 없이 실행 (업로드 대기열 미사용)
+    import utils.azure_helper
+    monkeypatch.setattr(utils.azure_helper, "get_shared_azure_helper", lambda: types.SimpleNamespace(connected=False))
+
+    parsed = []
+    read_billing_csv = processor_module.read_billing_csv
+
+    def counting_read(source):
+        parsed.append(source.name)
+        return read_billing_csv(source)
+
+    monkeypatch.setattr(processor_module, "read_billing_csv", counting_read)
+    proc = DataProcessor()
+    proc.parsed = parsed
+    return proc
+
+
+def test_same_upload_is_restored_from_cache(processor):
+    df = make_billing_frame(n_rows=300)
+    first = processor.process_uploaded_file(_upload(df, "a.csv", "id-1"))
+    # rerun 시 같은 위젯 값 / 같은 내용의 새 업로드 모두 재파싱 없음
+    again = processor.process_uploaded_file(_upload(df, "a.csv", "id-1"))
+    renamed = processor.process_uploaded_file(_upload(df, "a_copy.csv", "id-2"))
+
+    assert processor.parsed == ["a.csv"]
+    assert again is first and renamed is first
+    assert st.session_state.last_file == "a_copy.csv"
+    assert st.session_state.last_dataframe is first
+
+
+def test_switching_back_restores_session_state(processor):
+    df_a = make_billing_frame(n_rows=300, seed=1)
+    df_b = make_billing_frame(n_rows=300, seed=2, months=("2025-07-01",))
+    first_a = processor.process_uploaded_file(_upload(df_a, "a.csv", "id-a"))
+    processor.detect_anomalies(first_a)
+    first_b = processor.process_uploaded_file(_upload(df_b, "b.csv", "id-b"))
+    assert "2025-07" in st.session_state.biz_days
+
+    restored = processor.process_uploaded_file(_upload(df_a, "a.csv", "id-a"))
+
+    assert processor.parsed == ["a.csv", "b.csv"]
+    assert restored is first_a and restored is not first_b
+    assert st.session_state.last_dataframe is first_a
+    # 파생 지표 캐시도 복원된 데이터셋 기준
+    assert st.session_state.derived_metrics_cache["source"] is first_a
+    session = st.session_state.chat_sessions[st.session_state.current_session_id]
+    assert session["data"] is first_a and session["file"] == "a.csv"
+
+
+def test_changed_content_is_parsed_again(processor):
+    df = make_billing_frame(n_rows=300)
+    first = processor.process_uploaded_file(_upload(df, "a.csv", "id-1"))
+    df.loc[0, "m1청구금액"] = 123
+    second = processor.process_uploaded_file(_upload(df, "a.csv", "id-2"))
+
+    assert processor.parsed == ["a.csv", "a.csv"]
+    assert second is not first
+    assert second.loc[0, "m1청구금액"] == 123
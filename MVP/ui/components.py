@@ -468,7 +468,7 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd
-from utils.azure_helper import handle_azure_ai_query
+from utils.azure_helper import handle_azure_ai_query, invalidate_azure_data_cache
 
 # 🆕 enhanced_anomaly 함수들 import
 from ui.enhanced_anomaly import render_anomaly_detection, render_summary_section
@@ -487,9 +487,18 @@ def render_welcome_message():
     </div>
     """, unsafe_allow_html=True)
 
+def render_azure_load_notices(notices):
+    """Azure 데이터 로드 결과 표시 (파일별 로드 시간은 접힌 표로)"""
+    for level, content in notices:
+        if level == "timings":
+            with st.expander("⏱️ 파일별 로드 시간"):
+                st.dataframe(pd.DataFrame(content), use_container_width=True, hide_index=True)
+        else:
+            getattr(st, level)(content)
+
 def render_upload_section(data_processor, session_mgr=None):
     """업로드 섹션 렌더링"""
-    from config.settings import MIN_AMOUNT_DEFAULT, MIN_LINES_DEFAULT, CHANGE_THRESHOLD_DEFAULT
+    from config.settings import MIN_AMOUNT_DEFAULT, MIN_LINES_DEFAULT, CHANGE_THRESHOLD_DEFAULT, DETECTION_MODES
     
     with st.expander("📂 CSV 업로드 및 필터 설정", 
                      expanded=st.session_state.get('last_dataframe') is None):
@@ -509,7 +518,7 @@ def render_upload_section(data_processor, session_mgr=None):
             st.markdown("")
         with col2:
             st.caption("**📋 필터 설정**")
-            col1, col2,col3 =st.columns(3)
+            col1, col2,col3,col4 =st.columns(4)
             with col1:
                 min_amount = st.number_input(
                     "💰 요청금액 임계값", 
@@ -530,13 +539,28 @@ def render_upload_section(data_processor, session_mgr=None):
                     0, 100, CHANGE_THRESHOLD_DEFAULT,
                     help="이상 패턴 감지 기준"
                 )
-            data_processor.update_thresholds(min_amount, min_lines, change_threshold)
+            with col4:
+                detection_label = st.selectbox(
+                    "📐 탐지 방식",
+                    list(DETECTION_MODES.keys()),
+                    help="그룹 통계: lob/요금유형코드 그룹 내 중앙값·MAD 대비 로버스트 Z 점수로 판정"
+                )
+            data_processor.update_thresholds(min_amount, min_lines, change_threshold, DETECTION_MODES[detection_label])
+            # 임계값 프로필 안내 (데이터에 프로필 키 컬럼이 있을 때만 - 데이터 처리 후 표시)
+            profile_notice = st.empty()
     
     if uploaded_file:
         df = data_processor.process_uploaded_file(uploaded_file, session_mgr)
-        return df
+    else:
+        df = st.session_state.get('last_dataframe')
     
-    return st.session_state.get('last_dataframe')
+    profiles = data_processor.threshold_profiles
+    if profiles["profiles"] and df is not None and profiles["key"] in df.columns:
+        profile_notice.caption(
+            f"📑 {profiles['key']}별 임계값 프로필 적용 중: {', '.join(profiles['profiles'])} "
+            "(그 외 그룹은 위 입력값 사용)"
+        )
+    return df
 
 def render_data_analysis(df, data_processor, chat_mgr, session_mgr):
     """데이터 분석 섹션 렌더링 (간단하게)"""
@@ -714,6 +738,9 @@ def render_chat_interface(chat_mgr, session_mgr):
 
             # 사용자 직접 입력
             st.markdown("#### 🤖 **직접 질문하기**")
+            if st.button("🔄 Azure 데이터 새로고침", key="azure_refresh",
+                         help="공용 캐시를 비우고 다음 질문에서 Azure 데이터를 다시 불러옵니다"):
+                invalidate_azure_data_cache()
             user_question = st.text_input(
                 "Azure 저장 데이터에 대해 질문하세요:",
                 placeholder="예: DATA001 서비스가 언제부터 급성장했어? 원인은 뭘까?",
@@ -726,9 +753,11 @@ def render_chat_interface(chat_mgr, session_mgr):
             
             if query:
                 
-                # AI 분석 실행
-                # with st.spinner("🧠 Azure AI가 월별 데이터를 분석하고 있습니다..."):
-                ai_response = handle_azure_ai_query(query)
+                # AI 분석 실행 (공용 데이터 캐시에 없는 월은 이때 Azure에서 로드)
+                load_notices = []
+                with st.spinner("📊 Azure 데이터를 불러와 분석하고 있습니다..."):
+                    ai_response = handle_azure_ai_query(query, load_notices)
+                render_azure_load_notices(load_notices)
                 
                 # 응답 표시
                 st.markdown("##### 🤖 **AI 분석 결과**")
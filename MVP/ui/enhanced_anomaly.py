@@ -119,6 +119,8 @@ def render_clickable_anomaly_table(df):
     display_columns = []
     if '이상_유형' in df.columns:
         display_columns.append('이상_유형')
+    if '이상_점수' in df.columns:
+        display_columns.append('이상_점수')
     if '청구금액_변화율' in df.columns:
         display_columns.append('청구금액_변화율')
     if '회선수_변화율' in df.columns:
@@ -63,6 +63,9 @@ def render_sidebar_info():
     # 영업일 정보 (간단하게)
     render_business_day_summary()
     
+    # Azure 업로드 진행 상태
+    render_upload_status()
+    
     # 도움말 (간단하게)
     st.markdown("---")
     st.markdown("### ❓ 사용법")
@@ -97,6 +100,26 @@ def render_business_day_summary():
             if info['holiday_list']:
                 st.caption("🎌 " + ", ".join([h['name'] for h in info['holiday_list']]))
 
+def render_upload_status():
+    """Azure 백그라운드 업로드 상태 (현재 세션의 최근 작업)"""
+    from utils.upload_queue import get_upload_queue, STATUS_DONE, STATUS_FAILED
+    from utils.session import get_browser_session_id
+    
+    jobs = get_upload_queue().jobs(get_browser_session_id())
+    if not jobs:
+        return
+    
+    st.markdown("---")
+    st.markdown("### ☁️ Azure 업로드")
+    
+    status_icons = {STATUS_DONE: "✅", STATUS_FAILED: "❌"}
+    for job in jobs[:5]:
+        icon = status_icons.get(job['status'], "⏳")
+        attempts = f" ({job['attempts']}회 시도)" if job['attempts'] > 1 else ""
+        st.caption(f"{icon} {job['file']} - {job['status']}{attempts}")
+        if job['status'] == STATUS_FAILED and job['error']:
+            st.caption(f"　오류: {job['error']}")
+
 def render_footer():
     """푸터 렌더링"""
     st.markdown("---")
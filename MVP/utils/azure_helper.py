@@ -1,16 +1,43 @@
 # utils/azure_ai_helper.py - v4 완전 재작성 (제대로 된 AI 분석)
 import streamlit as st
-import io
+import numpy as np
 import pandas as pd
-from azure.storage.blob import BlobServiceClient
 import os
 from datetime import datetime
-import json
 import re
+import time
+import logging
+import threading
+from functools import partial
 from dotenv import load_dotenv
+from azure.core.exceptions import AzureError, ResourceNotFoundError
+from config.settings import (
+    AZURE_DOWNLOAD_WORKERS, AZURE_PARSE_WORKERS, AZURE_DATA_CACHE_TTL, AZURE_STORAGE_FORMAT, AZURE_UPLOAD_CONCURRENCY,
+    AZURE_DATA_PREFIXES, ROLLUP_PREFIX, CONVERTED_PREFIX, AZURE_MONTH_VIEW_CACHE_ENTRIES
+)
+from utils.blob_loader import (
+    load_blobs, clean_billing_frame, source_column_filter, ANALYSIS_SOURCE_COLUMNS, SOURCE_COLUMNS_ATTR
+)
+from utils.blob_cache import get_blob_cache
+from utils.blob_client import get_blob_service_client, check_container
+from utils.blob_sync import SyncCursor
+from utils.parquet_store import parquet_available, frame_to_parquet_bytes
+from utils.billing_facts import BillingFacts, month_over_month_growth, top_n_indices
+from utils.rollups import build_rollup, rollup_blob_name, fresh_rollups, drop_empty_keys
+from utils.upload_queue import get_sidecar_queue
+from utils.excel_convert import get_excel_converter, is_excel_blob, fresh_conversions
+from utils.manifest import partition_stats, read_manifest, write_manifest_entries, stale_partitions, select_partitions
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# 분석별로 읽는 컬럼 (질문 계획에서 선언, 월별 데이터는 이 컬럼만 남겨서 전달)
+SERVICE_CODE_COLUMNS = ['full_service_id', 'service_code', 'lob_name', 'billing_amount', 'line_count']
+SERVICE_COLUMNS = ['full_service_id', 'billing_amount', 'line_count']
+LOB_COLUMNS = ['lob_name', 'billing_amount', 'line_count']
+OVERVIEW_COLUMNS = ['full_service_id', 'lob_name', 'billing_amount', 'line_count']
+
 class AzureHelper:
     """Azure Blob Storage + 진짜 제대로 된 AI 분석 도우미 v4"""
     
@@ -18,25 +45,45 @@ class AzureHelper:
         self.setup_connection()
         self.available_files = []
         self.all_data_cache = None
+        self.all_data_loaded_at = 0.0
+        self.facts_cache = []
+        self.rollup_cache = None
+        self.rollup_loaded_at = 0.0
+        self.blob_frames = {}
+        self.blob_versions = {}
+        self.listing_cache = None
+        self.listing_loaded_at = 0.0
+        self.pruned_cache = {}
+        self.sync_cursor = SyncCursor()
+        self._data_lock = threading.Lock()
+        self._facts_lock = threading.Lock()
         
     def setup_connection(self):
-        """Azure 연결 설정"""
+        """Azure 연결 설정 (공용 클라이언트 + 캐시된 연결 상태 - 대부분 네트워크 요청 없음)"""
         connection_string = os.getenv('AZURE_STORAGE_CONNECTION_STRING')
         self.connected = False
         
         if connection_string:
             try:
-                self.client = BlobServiceClient.from_connection_string(connection_string)
-                container_client = self.client.get_container_client("billing-data")
-                container_client.get_container_properties()
-                self.connected = True
-                # st.success("✅ Azure 연결 성공!")
+                self.client = get_blob_service_client(connection_string)
             except Exception as e:
                 st.error(f"❌ Azure 연결 실패: {e}")
-                self.connected = False
+                return
+            self.check_connection(report=True)
         else:
             st.warning("⚠️ AZURE_STORAGE_CONNECTION_STRING이 설정되지 않았습니다.")
 
+    def check_connection(self, report=False):
+        """연결 상태 갱신 (확인 결과는 일정 시간 재사용)"""
+        if getattr(self, 'client', None) is None:
+            return False
+        
+        self.connected, error = check_container(self.client, "billing-data")
+        if not self.connected and report:
+            st.error(f"❌ Azure 연결 실패: {error}")
+        # st.success("✅ Azure 연결 성공!")
+        return self.connected
+
     def upload_csv(self, df, filename):
         """CSV 업로드"""
         if not self.connected:
@@ -48,65 +95,134 @@ class AzureHelper:
             blob_name = f"uploads/{timestamp}_{filename}"
             
             blob_client = self.client.get_blob_client(container="billing-data", blob=blob_name)
-            blob_client.upload_blob(csv_string, overwrite=True)
+            blob_client.upload_blob(csv_string, overwrite=True, max_concurrency=AZURE_UPLOAD_CONCURRENCY)
             return True, blob_name
         except Exception as e:
             return False, str(e)
 
-    def _discover_files(self):
-        """파일 탐지 및 데이터 로드"""
+    def _use_parquet(self):
+        """Parquet 저장 형식 사용 여부"""
+        return AZURE_STORAGE_FORMAT == "parquet" and parquet_available()
+
+    def upload_dataframe(self, df, filename):
+        """업로드 데이터 저장 (설정된 형식 - Parquet이면 기준월 파티션, 아니면 CSV)"""
+        if self._use_parquet():
+            return self.upload_parquet(df, filename)
+        return self.upload_csv(df, filename)
+
+    def upload_parquet(self, df, filename):
+        """Parquet 업로드 - 기준월별 파티션 (uploads/{시각}_{파일명}/{YYYY-MM}.parquet)
+
+        사용자 업로드는 컬럼 구성이 달라 분석용 월 데이터(monthly_data/)와 분리해서 보관
+        """
+        if not self.connected:
+            return False, "Azure 연결 안됨"
+        
+        try:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            prefix = f"uploads/{timestamp}_{os.path.splitext(filename)[0]}/"
+            container_client = self.client.get_container_client("billing-data")
+            
+            for month_key, part in self._month_partitions(df):
+                container_client.upload_blob(
+                    f"{prefix}{month_key}.parquet", frame_to_parquet_bytes(part),
+                    overwrite=True, max_concurrency=AZURE_UPLOAD_CONCURRENCY
+                )
+            return True, prefix
+        except Exception as e:
+            return False, str(e)
+
+    def save_monthly_data(self, df, month_key):
+        """월별 청구 데이터 저장 (monthly_data/billing_data_YYYY-MM.parquet 또는 .csv)"""
+        if not self.connected:
+            return False, "Azure 연결 안됨"
+        
+        try:
+            if self._use_parquet():
+                blob_name = f"monthly_data/billing_data_{month_key}.parquet"
+                payload = frame_to_parquet_bytes(df)
+            else:
+                blob_name = f"monthly_data/billing_data_{month_key}.csv"
+                payload = df.to_csv(index=False, encoding='utf-8-sig')
+            
+            container_client = self.client.get_container_client("billing-data")
+            uploaded = container_client.upload_blob(blob_name, payload, overwrite=True, max_concurrency=AZURE_UPLOAD_CONCURRENCY)
+        except Exception as e:
+            return False, str(e)
+        
+        # 월 데이터와 함께 집계 사이드카와 매니페스트 항목 저장 (실패해도 데이터 저장은 성공 - 다음 로드 때 다시 생성)
+        self._write_rollup(blob_name, df)
+        etag = uploaded.get('etag') if isinstance(uploaded, dict) else None
+        if etag is not None:
+            stats = partition_stats(etag, self._month_key(blob_name, 0), clean_billing_frame(df.copy()), columns=df.columns)
+            self._write_manifest(container_client, {blob_name: stats})
+        return True, blob_name
+
+    def _write_rollup(self, source_name, df):
+        """월 데이터 블롭의 LOB × 서비스 집계 저장 (rollups/{원본 경로}.parquet 또는 .csv)"""
+        try:
+            rollup = build_rollup(df)
+            if self._use_parquet():
+                rollup_name = rollup_blob_name(source_name, "parquet")
+                payload = frame_to_parquet_bytes(rollup)
+            else:
+                rollup_name = rollup_blob_name(source_name, "csv")
+                payload = rollup.to_csv(index=False)
+            
+            container_client = self.client.get_container_client("billing-data")
+            container_client.upload_blob(rollup_name, payload, overwrite=True)
+            return True, rollup_name
+        except Exception as e:
+            return False, str(e)
+
+    def _backfill_rollups(self, container_client, blobs):
+        """집계가 없거나 원본보다 오래된 파일은 로드한 프레임으로 백그라운드에서 집계 생성
+
+        월 데이터가 아닌 파일(요금제 카탈로그, 빈 파일)도 빈 집계를 남겨서 모든 파일에 집계가 있는 상태를 유지
+        """
+        fresh = fresh_rollups(blobs, container_client.list_blobs(name_starts_with=ROLLUP_PREFIX))
+        for blob in blobs:
+            df = self.blob_frames.get(blob.name)
+            if blob.name in fresh or df is None:
+                continue
+            get_sidecar_queue().submit(f"집계: {blob.name}", partial(self._write_rollup, blob.name, df))
+
+    def _month_partitions(self, df):
+        """기준월별 (YYYY-MM, 부분 프레임) 목록 (기준월 없으면 전체 1개, 날짜가 아닌 행은 unknown)"""
+        if '기준월' not in df.columns:
+            return [("all", df)]
+        
+        month_keys = pd.to_datetime(df['기준월'], errors='coerce').dt.strftime('%Y-%m').fillna("unknown")
+        return [(month_key, part) for month_key, part in df.groupby(month_keys, sort=True)]
+
+    def _list_billing_blobs(self, container_client):
+        """분석 대상 블롭 목록 (대상 폴더 접두사로 범위를 좁혀서 조회)"""
+        blobs = []
+        for prefix in AZURE_DATA_PREFIXES:
+            blobs.extend(
+                blob for blob in container_client.list_blobs(name_starts_with=prefix)
+                if self._is_billing_blob(blob.name)
+            )
+        return blobs
+
+    def _discover_files(self, notices=None):
+        """파일 탐지 및 데이터 로드 (마지막 동기화 이후 추가/변경된 파일만 가져와서 메모리 데이터에 병합)"""
         if not self.connected:
-            st.error("❌ Azure 연결이 필요합니다.")
+            if notices is not None:
+                notices.append(("error", "❌ Azure 연결이 필요합니다."))
             return {}
         
         try:
             container_client = self.client.get_container_client("billing-data")
-            blob_list = container_client.list_blobs()
+            target_blobs = self._list_billing_blobs(container_client)
             
-            all_data = {}
-            file_count = 0
+            # 메모리에 있는 버전과 비교 (변경 없으면 기존 데이터 그대로 사용)
+            removed = set(self.blob_frames) - {blob.name for blob in target_blobs}
+            changed = self._sync_blobs(container_client, target_blobs, removed, notices)
+            if not changed and self.all_data_cache is not None:
+                return self.all_data_cache
             
-            with st.spinner("📊 Azure에서 데이터 파일들을 로드 중..."):
-                for blob in blob_list:
-                    blob_name = blob.name
-                    
-                    # 대상 폴더 확인
-                    if not (blob_name.startswith('monthly_data/') or blob_name.startswith('plan_metadata/')):
-                        continue
-                    
-                    # 파일 확장자 확인
-                    if not blob_name.endswith(('.csv', '.xlsx', '.xls')):
-                        continue
-                    
-                    # 청구 데이터 키워드 확인
-                    billing_keywords = ['billing', 'data', '청구', '데이터', 'monthly', '월별']
-                    if not any(keyword in blob_name.lower() for keyword in billing_keywords):
-                        continue
-                    
-                    # 월 정보 추출
-                    month_match = re.search(r'(\d{4})[-_]?(\d{2})', blob_name)
-                    if month_match:
-                        year, month = month_match.groups()
-                        month_key = f"{year}-{month.zfill(2)}"
-                    else:
-                        month_key = f"unknown_{file_count}"
-                    
-                    # 데이터 로드
-                    try:
-                        if blob_name.endswith('.csv'):
-                            df = self._load_csv_blob(blob_name)
-                        else:
-                            df = self._load_excel_blob(blob_name)
-                        
-                        if df is not None and len(df) > 0:
-                            # 컬럼 정리
-                            df = self._clean_dataframe(df)
-                            all_data[month_key] = df
-                            file_count += 1
-                            # st.write(f"✅ {blob_name} 로드 완료 ({len(df)}행)")
-                            
-                    except Exception as e:
-                        st.warning(f"⚠️ 로드 실패")
+            all_data = self._assemble_months(target_blobs)
             
             # if all_data:
             #     st.success(f"🎉 총 {len(all_data)}개 월의 데이터 로드 완료!")
@@ -125,122 +241,410 @@ class AzureHelper:
             return all_data
             
         except Exception as e:
-            st.error(f"❌ 파일 탐지 실패: {e}")
+            if notices is not None:
+                notices.append(("error", f"❌ 파일 탐지 실패: {e}"))
             return {}
 
-    def _load_csv_blob(self, blob_name):
-        """CSV 블롭 로드"""
-        blob_client = self.client.get_blob_client(container="billing-data", blob=blob_name)
-        csv_content = blob_client.download_blob().readall()
+    def _sync_blobs(self, container_client, blobs, removed=(), notices=None):
+        """블롭 목록을 메모리 데이터에 동기화 (버전이 바뀐 블롭만 로드) - 변경 여부 반환
+
+        notices가 주어지면 화면에 표시할 로드 결과를 (종류, 내용)으로 추가
+        """
+        blob_cache = get_blob_cache()
+        to_refresh = [
+            blob for blob in blobs
+            if self.blob_versions.get(blob.name) != blob_cache.version_of(blob)
+        ]
+        if not to_refresh and not removed:
+            return False
+        notices = [] if notices is None else notices
+        
+        started = time.perf_counter()
+        
+        # 마지막 동기화 이후 그대로인 파일은 로컬 캐시 사용, 추가/변경된 파일만 다운로드
+        changed, _ = self.sync_cursor.diff(to_refresh)
+        changed_names = {blob.name for blob in changed}
+        results = {}
+        to_load = []
+        for blob in to_refresh:
+            df = None
+            if blob.name not in changed_names:
+                df = blob_cache.get(blob.name, blob_cache.version_of(blob))
+            if df is not None:
+                results[blob.name] = {
+                    'blob': blob.name, 'data': df, 'error': None, 'cached': True,
+                    'download_seconds': 0.0, 'parse_seconds': 0.0, 'bytes': 0
+                }
+            else:
+                to_load.append(blob)
+        
+        # Excel은 변환본(Parquet)이 있으면 그것을 읽고, 없으면 백그라운드에서 변환 (이번 로드에서는 제외)
+        to_load, converted, converting = self._route_excel_blobs(container_client, to_load, notices)
+        
+        loaded = load_blobs(
+            container_client, [converted.get(blob.name, blob.name) for blob in to_load],
+            AZURE_DOWNLOAD_WORKERS, AZURE_PARSE_WORKERS,
+            sizes={blob.name: getattr(blob, 'size', None) for blob in to_load if blob.name not in converted}
+        )
+        for blob, result in zip(to_load, loaded):
+            result['blob'] = blob.name
+            results[blob.name] = result
+            if result['error'] is None and result['data'] is not None and len(result['data']) > 0:
+                blob_cache.put(blob.name, blob_cache.version_of(blob), result['data'])
+        blob_cache.flush()
+        
+        results = [results[blob.name] for blob in to_refresh if blob.name in results]
+        elapsed = time.perf_counter() - started
+        
+        # 메모리 데이터에 병합 (실패한 파일은 이전 데이터 유지 후 다음 동기화에서 재시도)
+        for name in removed:
+            self.blob_frames.pop(name, None)
+            self.blob_versions.pop(name, None)
+        results_by_name = {result['blob']: result for result in results}
+        failed = {result['blob'] for result in results if result['error'] is not None}
+        for blob in to_refresh:
+            result = results_by_name.get(blob.name)
+            if result is None:
+                continue
+            if result['error'] is not None:
+                notices.append(("warning", f"⚠️ 로드 실패: {blob.name} ({result['error']})"))
+                continue
+            self.blob_frames[blob.name] = result['data']
+            self.blob_versions[blob.name] = blob_cache.version_of(blob)
+        self.sync_cursor.advance([blob for blob in to_refresh if blob.name not in failed], removed)
+        
+        loaded_blobs = [blob for blob in to_refresh if blob.name in results_by_name and blob.name not in failed]
+        self._backfill_rollups(container_client, loaded_blobs)
+        self._backfill_manifest(container_client, loaded_blobs, removed)
+        
+        self._report_load_timings(results, elapsed, notices)
+        if converting:
+            notices.append(("caption", f"📑 Excel 파일 {converting}개 변환 중 - 완료되면 다음 질문부터 반영됩니다"))
+        return True
+
+    def _backfill_manifest(self, container_client, blobs, removed=()):
+        """매니페스트에 없거나 오래된 파티션 항목을 로드한 프레임으로 백그라운드에서 갱신"""
+        manifest = self.listing_cache[1] if self.listing_cache is not None else read_manifest(container_client)[0]
+        stale = stale_partitions(manifest, blobs)
+        partitions = manifest.get('partitions', {})
+        removed = [name for name in removed if name in partitions]
+        
+        entries = {}
+        for blob in blobs:
+            df = self.blob_frames.get(blob.name)
+            if blob.name in stale and df is not None:
+                entries[blob.name] = partition_stats(blob.etag, self._month_key(blob.name, 0), df)
+        if entries or removed:
+            get_sidecar_queue().submit("매니페스트", partial(self._write_manifest, container_client, entries, removed))
+
+    def _write_manifest(self, container_client, entries, removed=()):
+        """매니페스트 항목 저장 - 성공하면 목록 캐시를 비워서 다음 질문부터 새 매니페스트 사용"""
+        success, result = write_manifest_entries(container_client, entries, removed)
+        if success:
+            self.listing_cache = None
+        return success, result
+
+    def _listing(self, container_client):
+        """대상 블롭 목록 + 매니페스트 (TTL 동안 재사용)"""
+        if self.listing_cache is None or time.time() - self.listing_loaded_at > AZURE_DATA_CACHE_TTL:
+            self.listing_cache = (self._list_billing_blobs(container_client), read_manifest(container_client)[0])
+            self.listing_loaded_at = time.time()
+        return self.listing_cache
+
+    def get_month_data(self, scope, service_code=None, columns=None, notices=None):
+        """질문에 필요한 월 파일만 로드해서 필요한 컬럼만 남긴 월별 데이터 (처음 필요할 때 가져오고 캐시)
+
+        월은 파일 이름으로 고르고, 서비스 코드 질문은 매니페스트가 최신이면 그 코드가 있는 월만 읽는다.
+        columns=None이면 모든 컬럼, Azure 오류면 None (호출 측에서 전체 로드로 대체)
+        """
+        if not self.connected:
+            return None
         
-        # 인코딩 시도
-        for encoding in ['utf-8-sig', 'utf-8', 'euc-kr', 'cp949']:
+        with self._data_lock:
             try:
-                content_str = csv_content.decode(encoding)
-                return pd.read_csv(io.StringIO(content_str))
-            except UnicodeDecodeError:
+                container_client = self.client.get_container_client("billing-data")
+                target_blobs, manifest = self._listing(container_client)
+                months = {blob.name: self._month_key(blob.name, 0) for blob in target_blobs}
+                selected = select_partitions(manifest, target_blobs, months, scope, service_code)
+                if not selected:
+                    return None
+                
+                removed = set(self.blob_frames) - set(months)
+                if self._sync_blobs(container_client, selected, removed, notices):
+                    self.all_data_cache = None
+                
+                # 같은 파일 버전 × 컬럼 조합이면 같은 데이터 객체 재사용 (파생 캐시 유지, 최근 사용 순 LRU)
+                key = (
+                    tuple((blob.name, self.blob_versions.get(blob.name)) for blob in selected),
+                    tuple(columns) if columns is not None else None
+                )
+                month_data = self.pruned_cache.pop(key, None)
+                if month_data is not None:
+                    self.pruned_cache[key] = month_data
+                else:
+                    month_data = self._project_months(self._assemble_months(selected), columns)
+                    while len(self.pruned_cache) >= AZURE_MONTH_VIEW_CACHE_ENTRIES:
+                        self.pruned_cache.pop(next(iter(self.pruned_cache)))
+                    self.pruned_cache[key] = month_data
+                return month_data
+            except ResourceNotFoundError:
+                # 목록 조회 중 컨테이너/블롭이 사라진 경우 - 전체 로드 경로로 대체
+                return None
+            except (AzureError, ValueError):
+                # 네트워크/권한 오류, 손상된 매니페스트(JSON) 등
+                logger.exception("월 데이터 로드 실패 (scope=%s) - 전체 로드로 대체", scope)
+                return None
+
+    def _project_months(self, all_data, columns):
+        """월별 데이터에서 필요한 컬럼만 남기기 (없는 컬럼은 건너뜀, columns=None이면 그대로)"""
+        if columns is None:
+            return all_data
+        return {month: df[[col for col in columns if col in df.columns]] for month, df in all_data.items()}
+
+    def _route_excel_blobs(self, container_client, blobs, notices):
+        """다운로드할 블롭 중 Excel 처리 - (이번에 읽을 블롭, {Excel 원본: 변환본 이름}, 변환 중인 파일 수)
+
+        변환에 실패한 버전은 다시 변환하지 않고 건너뜀 (파일이 바뀌면 다시 변환)
+        """
+        excel_blobs = [blob for blob in blobs if is_excel_blob(blob.name)]
+        if not excel_blobs:
+            return blobs, {}, 0
+        
+        converted = fresh_conversions(
+            excel_blobs, container_client.list_blobs(name_starts_with=CONVERTED_PREFIX, include=['metadata'])
+        )
+        converter = get_excel_converter()
+        converting = 0
+        for blob in excel_blobs:
+            if blob.name in converted:
                 continue
+            error = converter.failure(blob)
+            if error is not None:
+                notices.append(("warning", f"⚠️ Excel 변환 실패로 제외: {blob.name} ({error}) - 파일을 다시 올리면 재시도합니다"))
+                continue
+            converter.submit(container_client, blob, self._on_excel_converted)
+            converting += 1
         
-        raise Exception("지원되지 않는 인코딩")
-
-    def _load_excel_blob(self, blob_name):
-        """Excel 블롭 로드"""
-        blob_client = self.client.get_blob_client(container="billing-data", blob=blob_name)
-        excel_content = blob_client.download_blob().readall()
-        return pd.read_excel(io.BytesIO(excel_content))
-
-    def _clean_dataframe(self, df):
-        """데이터프레임 정리 및 표준화"""
-        # 컬럼명 정리
-        df.columns = df.columns.str.strip()
-        
-        # 표준 컬럼 매핑
-        column_mapping = {
-            '청구항목명': 'service_name',
-            '단위서비스명': 'unit_service_name',
-            '청구금액': 'billing_amount',
-            '회선수': 'line_count',
-            'lob명': 'lob_name',
-            'LOB명': 'lob_name',
-            '사업부': 'lob_name'
-        }
-        
-        # 매핑 적용
-        for old_col, new_col in column_mapping.items():
-            if old_col in df.columns:
-                df[new_col] = df[old_col]
-        
-        # 숫자 컬럼 정리
-        numeric_columns = ['billing_amount', 'line_count']
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        # 통합 서비스명 생성 (서비스 코드 포함)
-        if 'service_name' in df.columns:
-            df['full_service_id'] = df['service_name'].astype(str)
-            if 'unit_service_name' in df.columns:
-                df['full_service_id'] = df['service_name'].astype(str) + " | " + df['unit_service_name'].astype(str)
-        
-        # 서비스 코드 추출
-        if 'full_service_id' in df.columns:
-            df['service_code'] = df['full_service_id'].str.extract(r'([A-Z]{2,5}[0-9]{2,4})', expand=False)
-        
-        return df
-
-    def analyze_service_query(self, user_question):
-        """🎯 메인 분석 함수 - 사용자 질문 처리"""
+        to_load = [blob for blob in blobs if not is_excel_blob(blob.name) or blob.name in converted]
+        return to_load, converted, converting
+
+    def _on_excel_converted(self, blob, df):
+        """Excel 변환 완료 - 메모리 데이터와 로컬 캐시에 반영 (다음 질문에서 월별 데이터 다시 구성)"""
+        keep = source_column_filter(ANALYSIS_SOURCE_COLUMNS)
+        df = clean_billing_frame(df[[col for col in df.columns if keep(col)]])
+        df.attrs[SOURCE_COLUMNS_ATTR] = list(keep.seen)
+        blob_cache = get_blob_cache()
+        blob_cache.put(blob.name, blob_cache.version_of(blob), df)
+        with self._data_lock:
+            self.blob_frames[blob.name] = df
+            self.blob_versions[blob.name] = blob_cache.version_of(blob)
+            self.all_data_cache = None
+        
+        # 집계 사이드카와 매니페스트 항목도 바로 보충 (다음 동기화까지 기다리지 않음)
+        container_client = self.client.get_container_client("billing-data")
+        self._backfill_rollups(container_client, [blob])
+        self._backfill_manifest(container_client, [blob])
+
+    def _assemble_months(self, target_blobs, frames=None):
+        """블롭별 프레임 → 월별 데이터 (목록 순서대로 반영, 같은 월이면 뒤에 나온 파일 우선)"""
+        frames = self.blob_frames if frames is None else frames
+        all_data = {}
+        file_count = 0
+        for blob in target_blobs:
+            df = frames.get(blob.name)
+            if df is not None and len(df) > 0:
+                all_data[self._month_key(blob.name, file_count)] = df
+                file_count += 1
+                # st.write(f"✅ {blob_name} 로드 완료 ({len(df)}행)")
+        return all_data
+
+    def _is_billing_blob(self, blob_name):
+        """분석 대상 청구 데이터 파일인지 확인"""
+        # 대상 폴더 확인
+        if not (blob_name.startswith('monthly_data/') or blob_name.startswith('plan_metadata/')):
+            return False
+        
+        # 파일 확장자 확인
+        if not blob_name.endswith(('.csv', '.parquet', '.xlsx', '.xls')):
+            return False
+        
+        # 청구 데이터 키워드 확인
+        billing_keywords = ['billing', 'data', '청구', '데이터', 'monthly', '월별']
+        return any(keyword in blob_name.lower() for keyword in billing_keywords)
+
+    def _month_key(self, blob_name, file_count):
+        """블롭 이름에서 월 정보 추출 (없으면 unknown_N)"""
+        month_match = re.search(r'(\d{4})[-_]?(\d{2})', blob_name)
+        if month_match:
+            year, month = month_match.groups()
+            return f"{year}-{month.zfill(2)}"
+        return f"unknown_{file_count}"
+
+    def _report_load_timings(self, results, elapsed, notices):
+        """블롭별 다운로드/파싱 시간 요약 + 파일별 표 ("timings" 항목)를 notices에 추가"""
+        if not results:
+            return
+        
+        total_download = sum(r['download_seconds'] for r in results)
+        total_parse = sum(r['parse_seconds'] for r in results)
+        cached_count = sum(1 for r in results if r.get('cached'))
+        notices.append(("caption",
+            f"☁️ {len(results)}개 파일 로드 {elapsed:.2f}초 (로컬 캐시 {cached_count}개, "
+            f"다운로드 합계 {total_download:.2f}초, 파싱 합계 {total_parse:.2f}초)"
+        ))
+        notices.append(("timings", [
+            {
+                '파일': r['blob'],
+                '크기(KB)': round(r['bytes'] / 1024, 1),
+                '다운로드(초)': round(r['download_seconds'], 3),
+                '파싱(초)': round(r['parse_seconds'], 3),
+                '행 수': len(r['data']) if r['data'] is not None else 0,
+                '상태': '실패' if r['error'] is not None else '캐시' if r.get('cached') else '완료'
+            }
+            for r in results
+        ]))
+
+    def analyze_service_query(self, user_question, notices=None):
+        """🎯 메인 분석 함수 - 사용자 질문 처리 (데이터 로드 결과는 notices에 추가)"""
         
         if not self.connected:
             return "❌ **Azure 연결 오류**\n\nAzure Blob Storage 연결을 확인해주세요."
         
-        # 데이터 로드 (캐시 활용)
-        if self.all_data_cache is None:
-            self.all_data_cache = self._discover_files()
+        # 질문 분석 및 라우팅
+        analyze, args, data_kind, scope, columns = self._plan_question(user_question)
+        
+        # 데이터 로드 (합계만 필요한 질문은 집계 사이드카 우선, 아니면 분석이 선언한 월 × 컬럼만 필요할 때 로드)
+        all_data = self.get_rollup_data() if data_kind == "rollup" else None
+        if not all_data:
+            all_data = self.get_month_data(scope, args[0] if scope == "service_code" else None, columns, notices)
+        if not all_data:
+            all_data = self.get_all_data(notices)
         
-        if not self.all_data_cache:
+        if not all_data:
             return "❌ **데이터 없음**\n\n분석할 수 있는 청구 데이터가 없습니다."
         
-        # 질문 분석 및 라우팅
         try:
-            return self._route_question(user_question, self.all_data_cache)
+            return analyze(*args, user_question, all_data)
         except Exception as e:
             return f"❌ **분석 오류**\n\n{str(e)}\n\n다시 시도해주세요."
 
-    def _route_question(self, question, all_data):
-        """질문 유형 분석 및 적절한 분석 함수 호출"""
+    def get_all_data(self, notices=None):
+        """월별 데이터 (TTL 동안 메모리 캐시 재사용, 동시 요청은 한 번만 로드)"""
+        with self._data_lock:
+            expired = time.time() - self.all_data_loaded_at > AZURE_DATA_CACHE_TTL
+            if self.all_data_cache is None or expired:
+                all_data = self._discover_files(notices)
+                # 로드 실패(빈 결과)는 캐시하지 않고 다음 질문에서 다시 시도
+                if all_data:
+                    self.all_data_cache = all_data
+                    self.all_data_loaded_at = time.time()
+                    # 서비스 역색인은 로드 시점에 미리 생성
+                    self.get_facts(all_data).text_index
+                else:
+                    return all_data
+            return self.all_data_cache
+
+    def get_rollup_data(self):
+        """월별 LOB × 서비스 집계 (모든 월 데이터 파일에 최신 집계가 있을 때만, 아니면 None)"""
+        with self._data_lock:
+            expired = time.time() - self.rollup_loaded_at > AZURE_DATA_CACHE_TTL
+            if self.rollup_cache is None or expired:
+                # 집계를 쓸 수 없는 경우도 TTL 동안 기억 (질문마다 목록 조회 반복 방지)
+                self.rollup_cache = self._load_rollups() or {}
+                self.rollup_loaded_at = time.time()
+            return self.rollup_cache or None
+
+    def _load_rollups(self):
+        """집계 블롭 로드 (원본 월 데이터와 같은 월 키로 구성)"""
+        if not self.connected:
+            return None
+        
+        try:
+            container_client = self.client.get_container_client("billing-data")
+            target_blobs = self._list_billing_blobs(container_client)
+            fresh = fresh_rollups(target_blobs, container_client.list_blobs(name_starts_with=ROLLUP_PREFIX))
+            if not target_blobs or len(fresh) < len(target_blobs):
+                return None
+            
+            loaded = load_blobs(
+                container_client, [fresh[blob.name] for blob in target_blobs],
+                AZURE_DOWNLOAD_WORKERS, 1, columns=None
+            )
+        except AzureError:
+            logger.warning("집계 블롭 목록 조회 실패 - 원본 데이터로 분석", exc_info=True)
+            return None
+        
+        failed = [result for result in loaded if result['error'] is not None]
+        for result in failed:
+            logger.warning("집계 블롭 로드 실패: %s (%s)", result['blob'], result['error'])
+        if failed:
+            return None
+        
+        frames = {blob.name: drop_empty_keys(result['data']) for blob, result in zip(target_blobs, loaded)}
+        return self._assemble_months(target_blobs, frames)
+
+    def get_facts(self, all_data):
+        """월별 데이터의 통합 팩트 테이블 (같은 데이터 버전이면 재사용, 캐시에 남아 있는 데이터의 팩트 테이블만 보관)
+
+        get_all_data가 _data_lock을 잡은 채로 호출하므로 별도 잠금 사용
+        """
+        with self._facts_lock:
+            for facts in self.facts_cache:
+                if facts.source is all_data:
+                    return facts
+            facts = BillingFacts(all_data)
+            live = [self.all_data_cache, self.rollup_cache, *self.pruned_cache.values()]
+            self.facts_cache = [f for f in self.facts_cache if any(f.source is data for data in live)] + [facts]
+            return facts
+
+    def invalidate(self):
+        """데이터 캐시 무효화 (다음 질문에서 다시 로드)"""
+        with self._data_lock:
+            self.all_data_cache = None
+            self.all_data_loaded_at = 0.0
+            self.rollup_cache = None
+            self.listing_cache = None
+            self.pruned_cache = {}
+            self.facts_cache = []
+
+    def _plan_question(self, question):
+        """질문 유형 분석 - (분석 함수, 앞쪽 인자, 필요한 데이터, 필요한 월 범위, 필요한 컬럼)
+
+        필요한 데이터: "rollup"이면 월별 LOB × 서비스 합계만으로 답할 수 있는 질문, "detail"이면 원본 행 필요
+        필요한 월 범위: "all", "latest" (최신 월), "first_last" (첫 월 + 최신 월), "service_code" (해당 코드가 있는 월)
+        """
         
         question_lower = question.lower().strip()
         
         # 🔍 1. 특정 서비스 코드 질문 (DATA001, IOT002 등)
         service_codes = re.findall(r'\b[A-Z]{2,5}[0-9]{2,4}\b', question.upper())
         if service_codes:
-            return self._analyze_specific_service_code(service_codes[0], question, all_data)
+            return self._analyze_specific_service_code, (service_codes[0],), "detail", "service_code", SERVICE_CODE_COLUMNS
         
         # 🔍 2. 서비스명 직접 언급 (부분 매칭)
         service_keywords = ['무제한', '프리미엄', '센서', 'iot', '5g', 'lte', 'vpn', '데이터']
         mentioned_services = [kw for kw in service_keywords if kw in question_lower]
         if mentioned_services:
-            return self._analyze_service_by_keyword(mentioned_services, question, all_data)
+            return self._analyze_service_by_keyword, (mentioned_services,), "detail", "all", SERVICE_COLUMNS
         
         # 🔍 3. TOP/순위 분석
         if re.search(r'(top|톱|순위|랭킹)\s*\d*', question_lower):
-            return self._analyze_top_ranking(question, all_data)
+            return self._analyze_top_ranking, (), "detail", "first_last", SERVICE_COLUMNS
         
         # 🔍 4. 성장률/변화 분석
         if any(word in question_lower for word in ['성장', '변화', '증가', '감소', '트렌드']):
-            return self._analyze_growth_trend(question, all_data)
+            return self._analyze_growth_trend, (), "rollup", "all", SERVICE_COLUMNS
         
         # 🔍 5. LOB/사업부 분석
         if any(word in question_lower for word in ['lob', '사업부', '부서별']):
-            return self._analyze_lob_performance(question, all_data)
+            return self._analyze_lob_performance, (), "rollup", "latest", LOB_COLUMNS
         
         # 🔍 6. 비교 분석
         if any(word in question_lower for word in ['vs', '비교', '대비', '차이']):
-            return self._analyze_comparison(question, all_data)
+            return self._analyze_comparison, (), "detail", "latest", SERVICE_COLUMNS
         
         # 🔍 7. 기본 개요 분석
-        return self._analyze_overview(question, all_data)
+        return self._analyze_overview, (), "rollup", "all", OVERVIEW_COLUMNS
 
     def _analyze_specific_service_code(self, service_code, question, all_data):
         """특정 서비스 코드 분석 (DATA001, IOT002 등)"""
@@ -248,59 +652,37 @@ class AzureHelper:
         response = f"🎯 **{service_code} 서비스 상세 분석**\n\n"
         response += f"**질문**: {question}\n\n"
         
-        # 해당 서비스 코드를 포함한 모든 서비스 찾기
-        matching_services = set()
-        service_data = {}
-        
-        for month, df in all_data.items():
-            if 'service_code' in df.columns:
-                matches = df[df['service_code'] == service_code]
-                if len(matches) > 0:
-                    for _, row in matches.iterrows():
-                        service_full_name = row.get('full_service_id', '')
-                        matching_services.add(service_full_name)
-                        
-                        if service_full_name not in service_data:
-                            service_data[service_full_name] = {}
-                        
-                        service_data[service_full_name][month] = {
-                            'billing_amount': row.get('billing_amount', 0),
-                            'line_count': row.get('line_count', 0),
-                            'lob_name': row.get('lob_name', 'Unknown')
-                        }
+        # 해당 서비스 코드를 포함한 모든 서비스의 월별 이력 (팩트 테이블 인덱스 조회)
+        service_data = self.get_facts(all_data).service_code_history(service_code)
         
-        if not matching_services:
+        if not service_data:
             return f"❌ **'{service_code}' 서비스를 찾을 수 없습니다**\n\n다른 서비스 코드를 확인해주세요."
         
-        response += f"📋 **발견된 서비스**: {len(matching_services)}개\n\n"
+        response += f"📋 **발견된 서비스**: {len(service_data)}개\n\n"
         
         # 각 서비스별 상세 분석
-        for service_name in sorted(matching_services):
+        for service_name, monthly_data in service_data.items():
             response += f"### 🔸 {service_name}\n\n"
             
-            monthly_data = service_data[service_name]
-            sorted_months = sorted(monthly_data.keys())
+            sorted_months = list(monthly_data.index)
             
             if len(sorted_months) < 2:
                 response += "⚠️ 충분한 월별 데이터가 없습니다.\n\n"
                 continue
             
+            amounts = monthly_data['billing_amount'].to_numpy()
+            lines_by_month = monthly_data['line_count'].to_numpy()
+            
             # 월별 성과 표시
             response += "**📈 월별 성과**:\n\n"
-            for month in sorted_months:
-                data = monthly_data[month]
-                amount = data['billing_amount']
-                lines = data['line_count']
+            for month, amount, lines in zip(sorted_months, amounts, lines_by_month):
                 arpu = amount / lines if lines > 0 else 0
                 
                 response += f"- **{month}**: {amount:,.0f}원, {lines:,.0f}회선, ARPU {arpu:,.0f}원\n"
             
             # 성장률 계산
-            first_month_data = monthly_data[sorted_months[0]]
-            last_month_data = monthly_data[sorted_months[-1]]
-            
-            first_amount = first_month_data['billing_amount']
-            last_amount = last_month_data['billing_amount']
+            first_amount = amounts[0]
+            last_amount = amounts[-1]
             
             if first_amount > 0:
                 growth_rate = ((last_amount - first_amount) / first_amount) * 100
@@ -324,21 +706,12 @@ class AzureHelper:
                 if "언제부터" in question and "급성장" in question:
                     response += "**🔍 급성장 시점 분석**:\n\n"
                     
-                    growth_points = []
-                    for i in range(1, len(sorted_months)):
-                        prev_month = sorted_months[i-1]
-                        curr_month = sorted_months[i]
-                        
-                        prev_amount = monthly_data[prev_month]['billing_amount']
-                        curr_amount = monthly_data[curr_month]['billing_amount']
-                        
-                        if prev_amount > 0:
-                            month_growth = ((curr_amount - prev_amount) / prev_amount) * 100
-                            if month_growth > 30:  # 30% 이상을 급성장으로 정의
-                                growth_points.append({
-                                    'month': curr_month,
-                                    'growth': month_growth
-                                })
+                    # 전월 대비 30% 이상을 급성장으로 정의
+                    month_growth = month_over_month_growth(amounts)
+                    growth_points = [
+                        {'month': sorted_months[i + 1], 'growth': month_growth[i]}
+                        for i in np.flatnonzero(month_growth > 30)
+                    ]
                     
                     if growth_points:
                         first_growth_month = growth_points[0]['month']
@@ -360,45 +733,29 @@ class AzureHelper:
         response += f"**질문**: {question}\n"
         response += f"**검색 키워드**: {', '.join(keywords)}\n\n"
         
-        # 키워드 매칭 서비스 찾기
-        matching_services = set()
-        
-        for month, df in all_data.items():
-            if 'full_service_id' in df.columns:
-                for keyword in keywords:
-                    matches = df[df['full_service_id'].str.contains(keyword, case=False, na=False)]
-                    matching_services.update(matches['full_service_id'].tolist())
+        # 키워드 매칭 서비스 찾기 (역색인 조회)
+        facts = self.get_facts(all_data)
+        pivot = facts.pivot
+        matching_services = facts.text_index.search_any(keywords)
         
         if not matching_services:
             return f"❌ **'{', '.join(keywords)}' 관련 서비스를 찾을 수 없습니다**\n\n다른 키워드를 시도해보세요."
         
         response += f"📋 **발견된 서비스**: {len(matching_services)}개\n\n"
         
-        # 최신 월 기준 성과 순위
+        # 최신 월 기준 성과 순위 (최신 월에 있는 서비스만, 서비스별 첫 행 청구금액 순 상위 10개)
         latest_month = max(all_data.keys())
-        latest_data = all_data[latest_month]
-        
-        service_performance = []
-        
-        for service in matching_services:
-            service_rows = latest_data[latest_data['full_service_id'] == service]
-            if len(service_rows) > 0:
-                row = service_rows.iloc[0]
-                service_performance.append({
-                    'service': service,
-                    'amount': row.get('billing_amount', 0),
-                    'lines': row.get('line_count', 0)
-                })
         
-        # 청구금액 순으로 정렬
-        service_performance.sort(key=lambda x: x['amount'], reverse=True)
+        positions = np.array(sorted(matching_services), dtype=int)
+        positions = positions[pivot.present[positions, -1]]
+        positions = positions[top_n_indices(pivot.first_billing[positions, -1], 10)]
         
         response += f"**📊 성과 순위** ({latest_month} 기준):\n\n"
         
-        for i, sp in enumerate(service_performance[:10], 1):  # 상위 10개만
-            service = sp['service']
-            amount = sp['amount']
-            lines = sp['lines']
+        for i, position in enumerate(positions, 1):
+            service = pivot.services[position]
+            amount = pivot.first_billing[position, -1]
+            lines = pivot.first_lines[position, -1]
             arpu = amount / lines if lines > 0 else 0
             
             rank_emoji = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
@@ -425,20 +782,16 @@ class AzureHelper:
         if 'full_service_id' not in latest_data.columns:
             return "❌ 서비스 데이터를 찾을 수 없습니다."
         
-        # 서비스별 집계
-        service_summary = latest_data.groupby('full_service_id').agg({
-            'billing_amount': 'sum',
-            'line_count': 'sum'
-        }).fillna(0)
-        
-        # 청구금액 순으로 정렬
-        service_summary = service_summary.sort_values('billing_amount', ascending=False)
+        # 서비스별 집계 (서비스 × 월 행렬의 최신 월 열에서 상위 N개)
+        pivot = self.get_facts(all_data).pivot
+        top_services = pivot.top_services(-1, top_count)
         
         response += f"**📊 TOP {top_count} 서비스** ({latest_month} 기준):\n\n"
         
-        for i, (service, data) in enumerate(service_summary.head(top_count).iterrows(), 1):
-            amount = data['billing_amount']
-            lines = data['line_count']
+        for i, position in enumerate(top_services, 1):
+            service = pivot.services[position]
+            amount = pivot.billing[position, -1]
+            lines = pivot.lines[position, -1]
             arpu = amount / lines if lines > 0 else 0
             
             rank_emoji = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
@@ -464,38 +817,18 @@ class AzureHelper:
         first_month = months[0]
         last_month = months[-1]
         
-        # 성장률 계산
-        growth_data = []
-        
-        # 공통 서비스 찾기
-        first_services = set(all_data[first_month]['full_service_id'].dropna())
-        last_services = set(all_data[last_month]['full_service_id'].dropna())
-        common_services = first_services.intersection(last_services)
-        
-        for service in common_services:
-            first_amount = all_data[first_month][all_data[first_month]['full_service_id'] == service]['billing_amount'].sum()
-            last_amount = all_data[last_month][all_data[last_month]['full_service_id'] == service]['billing_amount'].sum()
-            
-            if first_amount > 0:
-                growth_rate = ((last_amount - first_amount) / first_amount) * 100
-                growth_data.append({
-                    'service': service,
-                    'growth_rate': growth_rate,
-                    'first_amount': first_amount,
-                    'last_amount': last_amount
-                })
-        
-        # 성장률 순으로 정렬
-        growth_data.sort(key=lambda x: x['growth_rate'], reverse=True)
+        # 성장률 계산 (첫 월과 마지막 월에 모두 있는 서비스)
+        pivot = self.get_facts(all_data).pivot
+        positions, growth_rates = pivot.growth_ranking(top_count)
         
         response = f"\n**🚀 성장률 TOP {top_count}** ({first_month} → {last_month}):\n\n"
         
-        for i, gd in enumerate(growth_data[:top_count], 1):
+        for i, (position, growth_rate) in enumerate(zip(positions, growth_rates), 1):
             rank_emoji = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
             
-            response += f"{rank_emoji} **{gd['service']}**\n"
-            response += f"   📈 성장률: {gd['growth_rate']:+.1f}%\n"
-            response += f"   💰 {gd['first_amount']:,.0f}원 → {gd['last_amount']:,.0f}원\n\n"
+            response += f"{rank_emoji} **{pivot.services[position]}**\n"
+            response += f"   📈 성장률: {growth_rate:+.1f}%\n"
+            response += f"   💰 {pivot.billing[position, 0]:,.0f}원 → {pivot.billing[position, -1]:,.0f}원\n\n"
         
         return response
 
@@ -511,37 +844,29 @@ class AzureHelper:
         
         response += f"**📊 분석 기간**: {months[0]} ~ {months[-1]} ({len(months)}개월)\n\n"
         
-        # 전체 시장 트렌드
-        monthly_totals = []
-        for month in months:
-            total_amount = all_data[month]['billing_amount'].sum()
-            total_lines = all_data[month]['line_count'].sum()
-            monthly_totals.append({
-                'month': month,
-                'amount': total_amount,
-                'lines': total_lines
-            })
+        # 전체 시장 트렌드 (월별 합계 배열)
+        pivot = self.get_facts(all_data).pivot
+        amounts = pivot.month_billing
+        monthly_growth = month_over_month_growth(amounts)
         
         response += "**🌟 전체 시장 트렌드**:\n\n"
         
-        for i, mt in enumerate(monthly_totals):
+        for i, month in enumerate(months):
             growth_indicator = ""
-            if i > 0:
-                prev_amount = monthly_totals[i-1]['amount']
-                if prev_amount > 0:
-                    monthly_growth = ((mt['amount'] - prev_amount) / prev_amount) * 100
-                    if monthly_growth > 5:
-                        growth_indicator = f" 📈 ({monthly_growth:+.1f}%)"
-                    elif monthly_growth < -5:
-                        growth_indicator = f" 📉 ({monthly_growth:+.1f}%)"
-                    else:
-                        growth_indicator = f" ➡️ ({monthly_growth:+.1f}%)"
+            if i > 0 and not np.isnan(monthly_growth[i - 1]):
+                growth = monthly_growth[i - 1]
+                if growth > 5:
+                    growth_indicator = f" 📈 ({growth:+.1f}%)"
+                elif growth < -5:
+                    growth_indicator = f" 📉 ({growth:+.1f}%)"
+                else:
+                    growth_indicator = f" ➡️ ({growth:+.1f}%)"
             
-            response += f"- **{mt['month']}**: {mt['amount']:,.0f}원, {mt['lines']:,.0f}회선{growth_indicator}\n"
+            response += f"- **{month}**: {amounts[i]:,.0f}원, {pivot.month_lines[i]:,.0f}회선{growth_indicator}\n"
         
         # 전체 성장률
-        if monthly_totals[0]['amount'] > 0:
-            total_growth = ((monthly_totals[-1]['amount'] - monthly_totals[0]['amount']) / monthly_totals[0]['amount']) * 100
+        if amounts[0] > 0:
+            total_growth = ((amounts[-1] - amounts[0]) / amounts[0]) * 100
             response += f"\n**🎯 전체 성장률**: {total_growth:+.1f}%\n\n"
         
         # 고성장 서비스 TOP 5
@@ -598,18 +923,18 @@ class AzureHelper:
             keyword1, keyword2 = comparison_keywords[0]
             response += f"**🔍 비교 대상**: {keyword1} vs {keyword2}\n\n"
             
-            # 각 키워드에 해당하는 서비스 찾기
-            latest_month = max(all_data.keys())
-            latest_data = all_data[latest_month]
-            
-            services1 = latest_data[latest_data['full_service_id'].str.contains(keyword1, case=False, na=False)]
-            services2 = latest_data[latest_data['full_service_id'].str.contains(keyword2, case=False, na=False)]
+            # 각 키워드에 해당하는 서비스 찾기 (역색인 조회 후 최신 월에 있는 서비스)
+            facts = self.get_facts(all_data)
+            pivot = facts.pivot
+            latest_present = np.flatnonzero(pivot.present[:, -1])
+            services1 = np.intersect1d(latest_present, np.fromiter(facts.text_index.search(keyword1), dtype=int))
+            services2 = np.intersect1d(latest_present, np.fromiter(facts.text_index.search(keyword2), dtype=int))
             
             if len(services1) > 0 and len(services2) > 0:
-                amount1 = services1['billing_amount'].sum()
-                amount2 = services2['billing_amount'].sum()
-                lines1 = services1['line_count'].sum()
-                lines2 = services2['line_count'].sum()
+                amount1 = float(pivot.billing[services1, -1].sum())
+                amount2 = float(pivot.billing[services2, -1].sum())
+                lines1 = float(pivot.lines[services1, -1].sum())
+                lines2 = float(pivot.lines[services2, -1].sum())
                 
                 response += f"**📊 {keyword1.upper()} 계열**:\n"
                 response += f"- 💰 청구금액: {amount1:,.0f}원\n"
@@ -681,14 +1006,38 @@ class AzureHelper:
         return response
 
 
-def handle_azure_ai_query(user_question):
-    """Azure AI 질문 처리 함수 (메인 진입점)"""
+_shared_helper = None
+_shared_helper_lock = threading.Lock()
+
+
+def get_shared_azure_helper():
+    """프로세스 공용 AzureHelper (모든 세션이 연결과 데이터 캐시를 공유, 연결 실패 시 다음 호출에서 재시도)"""
+    global _shared_helper
+    helper = _shared_helper
+    if helper is not None and helper.check_connection():
+        return helper
+    
+    with _shared_helper_lock:
+        if _shared_helper is None or not _shared_helper.connected:
+            _shared_helper = AzureHelper()
+        return _shared_helper
+
+
+def invalidate_azure_data_cache():
+    """공용 데이터 캐시 무효화 (Azure에 새 데이터가 올라온 경우 등)"""
+    helper = _shared_helper
+    if helper is not None:
+        helper.invalidate()
+
+
+def handle_azure_ai_query(user_question, notices=None):
+    """Azure AI 질문 처리 함수 (메인 진입점) - 데이터 로드 결과는 notices에 (종류, 내용)으로 추가"""
     
     if not user_question or user_question.strip() == "":
         return "❓ **질문을 입력해주세요**\n\n분석하고 싶은 내용을 구체적으로 말씀해주세요."
     
-    # Azure Helper 초기화
-    azure_helper = AzureHelper()
+    # 공용 Azure Helper (연결/데이터 캐시 재사용)
+    azure_helper = get_shared_azure_helper()
     
     if not azure_helper.connected:
         return """❌ **Azure 연결 실패**
@@ -703,7 +1052,7 @@ def handle_azure_ai_query(user_question):
     # 분석 실행
     try:
         # with st.spinner("🤖 Azure 데이터를 분석하고 있습니다..."):
-        result = azure_helper.analyze_service_query(user_question)
+        result = azure_helper.analyze_service_query(user_question, notices)
         
         return result
         
@@ -0,0 +1,173 @@
+# utils/billing_facts.py
+# Azure 분석용 통합 팩트 테이블 - 월별 프레임을 하나의 긴 테이블로 합치고 서비스 코드/서비스 ID 인덱스 구성
+import numpy as np
+import pandas as pd
+from utils.service_index import ServiceTextIndex
+
+FACT_COLUMNS = ['month', 'full_service_id', 'service_code', 'lob_name', 'billing_amount', 'line_count']
+
+
+class BillingFacts:
+    """월 × 서비스 팩트 테이블 (데이터 버전당 한 번 생성)
+
+    rows는 (service_code, full_service_id, month) 순으로 정렬되어 있고,
+    인덱스는 키 → 행 위치 배열 해시이므로 서비스별 이력은 한 번의 위치 슬라이스로 얻는다.
+    """
+
+    def __init__(self, all_data):
+        self.source = all_data
+        self.months = sorted(all_data.keys())
+
+        frames = [self._month_facts(month, df) for month, df in all_data.items()]
+        frames = [frame for frame in frames if len(frame) > 0]
+        if frames:
+            facts = pd.concat(frames, ignore_index=True)
+        else:
+            facts = pd.DataFrame({col: pd.Series(dtype=object) for col in FACT_COLUMNS})
+
+        facts['month'] = pd.Categorical(facts['month'], categories=self.months, ordered=True)
+        self.rows = facts.sort_values(
+            ['service_code', 'full_service_id', 'month'], kind='stable', na_position='last'
+        ).reset_index(drop=True)
+
+        self.service_code_index = self.rows.groupby('service_code', sort=False, observed=True).indices
+        self.service_id_index = self.rows.groupby('full_service_id', sort=False, observed=True).indices
+        self._pivot = None
+        self._text_index = None
+
+    @property
+    def pivot(self):
+        """서비스 × 월 집계 행렬 (처음 사용할 때 한 번 생성)"""
+        if self._pivot is None:
+            self._pivot = ServicePivot(self.rows, self.months)
+        return self._pivot
+
+    @property
+    def text_index(self):
+        """서비스 ID 역색인 (위치는 pivot.services 순서)"""
+        if self._text_index is None:
+            self._text_index = ServiceTextIndex(self.pivot.services)
+        return self._text_index
+
+    @staticmethod
+    def _month_facts(month, df):
+        """월 프레임 → 팩트 컬럼만 남긴 프레임 (없는 컬럼은 기본값)"""
+        facts = pd.DataFrame(index=df.index)
+        facts['month'] = month
+        facts['full_service_id'] = df['full_service_id'] if 'full_service_id' in df.columns else None
+        facts['service_code'] = df['service_code'] if 'service_code' in df.columns else None
+        facts['lob_name'] = df['lob_name'] if 'lob_name' in df.columns else 'Unknown'
+        for col in ['billing_amount', 'line_count']:
+            facts[col] = df[col] if col in df.columns else 0
+        return facts.reset_index(drop=True)
+
+    def _slice(self, index, key):
+        positions = index.get(key)
+        if positions is None:
+            return self.rows.iloc[0:0]
+        return self.rows.iloc[positions]
+
+    def rows_for_service_code(self, service_code):
+        """서비스 코드에 해당하는 전체 월 행"""
+        return self._slice(self.service_code_index, service_code)
+
+    def rows_for_service(self, full_service_id):
+        """서비스 ID에 해당하는 전체 월 행"""
+        return self._slice(self.service_id_index, full_service_id)
+
+    def service_code_history(self, service_code):
+        """서비스 코드별 월 이력 - {full_service_id: 월 인덱스 프레임(billing_amount, line_count, lob_name)}
+
+        같은 월에 같은 서비스 행이 여러 개면 파일에서 마지막 행 값 사용 (합산하지 않음)
+        """
+        rows = self.rows_for_service_code(service_code)
+        if len(rows) == 0:
+            return {}
+
+        # rows는 같은 (서비스, 월) 안에서 원본 행 순서 유지 (stable 정렬)
+        monthly = rows.drop_duplicates(['full_service_id', 'month'], keep='last').set_index(
+            ['full_service_id', 'month']
+        )[['billing_amount', 'line_count', 'lob_name']].sort_index()
+        monthly['lob_name'] = monthly['lob_name'].fillna('Unknown')
+        return {
+            service: history.droplevel('full_service_id')
+            for service, history in monthly.groupby(level='full_service_id', sort=True)
+        }
+
+
+class ServicePivot:
+    """서비스 × 월 청구금액/회선수 NumPy 행렬
+
+    services: 서비스 ID (정렬), months: 월 (정렬) - 행렬의 행/열 순서
+    present: 해당 월에 서비스 행이 있는지 여부
+    first_billing/first_lines: 해당 월 서비스의 첫 행 값 (같은 월에 행이 여러 개일 때 합계 대신 쓰는 값)
+    month_billing/month_lines: 월별 전체 합계 (서비스 ID 없는 행 포함)
+    """
+
+    def __init__(self, rows, months):
+        self.months = list(months)
+        month_codes = rows['month'].cat.codes.to_numpy()
+        billing = rows['billing_amount'].to_numpy(dtype=float)
+        lines = rows['line_count'].to_numpy(dtype=float)
+
+        n_months = len(self.months)
+        self.month_billing = np.bincount(month_codes, weights=billing, minlength=n_months)
+        self.month_lines = np.bincount(month_codes, weights=lines, minlength=n_months)
+
+        valid = rows['full_service_id'].notna().to_numpy()
+        service_codes, services = pd.factorize(rows['full_service_id'][valid], sort=True)
+        self.services = np.asarray(services, dtype=object)
+        self.service_positions = {service: i for i, service in enumerate(self.services)}
+
+        shape = (len(self.services), n_months)
+        cells = service_codes * n_months + month_codes[valid]
+        size = shape[0] * shape[1]
+        self.billing = np.bincount(cells, weights=billing[valid], minlength=size).reshape(shape)
+        self.lines = np.bincount(cells, weights=lines[valid], minlength=size).reshape(shape)
+        self.present = np.bincount(cells, minlength=size).reshape(shape) > 0
+
+        # rows는 같은 (서비스, 월) 안에서 원본 행 순서 유지 → 셀별 첫 위치가 원본 첫 행
+        first_cells, first_rows = np.unique(cells, return_index=True)
+        self.first_billing = np.zeros(size)
+        self.first_lines = np.zeros(size)
+        self.first_billing[first_cells] = billing[valid][first_rows]
+        self.first_lines[first_cells] = lines[valid][first_rows]
+        self.first_billing = self.first_billing.reshape(shape)
+        self.first_lines = self.first_lines.reshape(shape)
+
+    def top_services(self, month_index, top_count):
+        """해당 월 청구금액 상위 서비스 위치 (금액 내림차순)"""
+        candidates = np.flatnonzero(self.present[:, month_index])
+        order = top_n_indices(self.billing[candidates, month_index], top_count)
+        return candidates[order]
+
+    def growth_ranking(self, top_count, first_index=0, last_index=-1):
+        """두 월 사이 성장률 상위 서비스 - (서비스 위치, 성장률(%)) (양쪽 월에 모두 있고 시작 금액 > 0)"""
+        first = self.billing[:, first_index]
+        last = self.billing[:, last_index]
+        eligible = self.present[:, first_index] & self.present[:, last_index] & (first > 0)
+
+        positions = np.flatnonzero(eligible)
+        growth = (last[positions] - first[positions]) / first[positions] * 100
+        order = top_n_indices(growth, top_count)
+        return positions[order], growth[order]
+
+
+def top_n_indices(values, top_count):
+    """상위 N개 위치 (값 내림차순) - 전체 정렬 대신 argpartition"""
+    values = np.asarray(values)
+    if top_count <= 0 or len(values) == 0:
+        return np.array([], dtype=int)
+    if top_count < len(values):
+        candidates = np.argpartition(-values, top_count - 1)[:top_count]
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.argsort(-values[candidates], kind='stable')]
+
+
+def month_over_month_growth(amounts):
+    """월별 금액 배열 → 전월 대비 성장률(%) 배열 (전월 0 이하이면 nan)"""
+    amounts = np.asarray(amounts, dtype=float)
+    prev = amounts[:-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(prev > 0, (amounts[1:] - prev) / prev * 100, np.nan)
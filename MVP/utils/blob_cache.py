@@ -0,0 +1,171 @@
+# utils/blob_cache.py
+# 로컬 블롭 캐시 - 파싱/정리된 월별 프레임을 Parquet로 저장 (블롭 이름 + ETag 기준, 용량 초과 시 LRU 삭제)
+import os
+import json
+import time
+import hashlib
+import threading
+import pandas as pd
+from config.settings import BLOB_CACHE_DIR, BLOB_CACHE_MAX_BYTES
+
+try:
+    import pyarrow  # noqa: F401  (Parquet 엔진)
+except ImportError:  # pyarrow 미설치 시 캐시 비활성화
+    pyarrow = None
+
+INDEX_FILE = "index.json"
+
+
+class LocalBlobCache:
+    """디스크 블롭 캐시 (목록 조회 결과의 ETag/수정시각으로 유효성 확인)"""
+
+    def __init__(self, cache_dir=BLOB_CACHE_DIR, max_bytes=BLOB_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = pyarrow is not None
+        self._lock = threading.Lock()
+        self._index = {}
+        self._dirty = False
+
+        if self.enabled:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                self._index = self._read_index()
+            except OSError:
+                self.enabled = False
+
+    def _index_path(self):
+        return os.path.join(self.cache_dir, INDEX_FILE)
+
+    def _read_index(self):
+        """인덱스 파일 읽기 (깨졌거나 없으면 빈 인덱스)"""
+        try:
+            with open(self._index_path(), encoding="utf-8") as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        """인덱스 파일 저장 (임시 파일 후 교체)"""
+        temp_path = self._index_path() + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(temp_path, self._index_path())
+        self._dirty = False
+
+    def _data_path(self, blob_name):
+        digest = hashlib.blake2b(blob_name.encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.parquet")
+
+    @staticmethod
+    def version_of(blob):
+        """목록 조회 결과(BlobProperties)의 버전 식별자 (ETag, 수정시각)"""
+        last_modified = getattr(blob, "last_modified", None)
+        return str(getattr(blob, "etag", "") or ""), str(last_modified or "")
+
+    def get(self, blob_name, version):
+        """캐시된 프레임 반환 (버전이 다르거나 없으면 None)"""
+        if not self.enabled:
+            return None
+
+        etag, last_modified = version
+        with self._lock:
+            entry = self._index.get(blob_name)
+            if entry is None or entry["etag"] != etag or entry["last_modified"] != last_modified:
+                return None
+            path = self._data_path(blob_name)
+
+        try:
+            df = pd.read_parquet(path)
+        except Exception:
+            self.remove(blob_name)
+            return None
+
+        with self._lock:
+            if blob_name in self._index:
+                self._index[blob_name]["last_access"] = time.time()
+                self._dirty = True
+        return df
+
+    def put(self, blob_name, version, df):
+        """프레임 저장 후 용량 초과분 LRU 삭제 (저장 실패 시 캐시하지 않음)"""
+        if not self.enabled:
+            return False
+
+        path = self._data_path(blob_name)
+        temp_path = path + ".tmp"
+        try:
+            df.to_parquet(temp_path, index=False)
+            os.replace(temp_path, path)
+        except Exception:
+            # 혼합 타입 컬럼 등 Parquet로 저장할 수 없는 프레임
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+        etag, last_modified = version
+        with self._lock:
+            self._index[blob_name] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "bytes": os.path.getsize(path),
+                "last_access": time.time()
+            }
+            self._evict()
+            self._write_index()
+        return True
+
+    def remove(self, blob_name):
+        """항목 삭제"""
+        with self._lock:
+            self._index.pop(blob_name, None)
+            self._remove_file(blob_name)
+            self._write_index()
+
+    def _remove_file(self, blob_name):
+        try:
+            os.remove(self._data_path(blob_name))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """총 용량이 한도를 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (잠금 보유 상태에서 호출)"""
+        total = sum(entry["bytes"] for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for blob_name, entry in sorted(self._index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["bytes"]
+            del self._index[blob_name]
+            self._remove_file(blob_name)
+
+    def flush(self):
+        """마지막 사용 시각 변경분 저장"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._dirty:
+                try:
+                    self._write_index()
+                except OSError:
+                    pass
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(entry["bytes"] for entry in self._index.values())
+
+
+_blob_cache = None
+_blob_cache_lock = threading.Lock()
+
+
+def get_blob_cache():
+    """프로세스 공용 로컬 블롭 캐시 반환"""
+    global _blob_cache
+    if _blob_cache is None:
+        with _blob_cache_lock:
+            if _blob_cache is None:
+                _blob_cache = LocalBlobCache()
+    return _blob_cache
@@ -0,0 +1,57 @@
+# utils/blob_client.py
+# 공용 BlobServiceClient - 연결 문자열당 하나만 생성 (HTTP 연결 풀 재사용) + 연결 상태 확인 결과 캐시
+import time
+import threading
+import requests
+from azure.core.pipeline.transport import RequestsTransport
+from azure.storage.blob import BlobServiceClient
+from config.settings import (
+    AZURE_HTTP_POOL_SIZE, AZURE_HEALTH_CHECK_INTERVAL, AZURE_HEALTH_CHECK_RETRY_INTERVAL,
+    AZURE_UPLOAD_BLOCK_BYTES, AZURE_UPLOAD_SINGLE_PUT_BYTES
+)
+
+_clients = {}
+_health = {}
+_lock = threading.Lock()
+
+
+def get_blob_service_client(connection_string):
+    """연결 문자열별 공용 클라이언트 (네트워크 요청 없음)"""
+    with _lock:
+        client = _clients.get(connection_string)
+        if client is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=AZURE_HTTP_POOL_SIZE, pool_maxsize=AZURE_HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            client = BlobServiceClient.from_connection_string(
+                connection_string,
+                transport=RequestsTransport(session=session, session_owner=False),
+                max_block_size=AZURE_UPLOAD_BLOCK_BYTES,
+                max_single_put_size=AZURE_UPLOAD_SINGLE_PUT_BYTES
+            )
+            _clients[connection_string] = client
+        return client
+
+
+def check_container(client, container_name):
+    """컨테이너 접근 가능 여부 - (성공 여부, 오류 메시지)
+
+    결과는 성공 시 AZURE_HEALTH_CHECK_INTERVAL초, 실패 시 AZURE_HEALTH_CHECK_RETRY_INTERVAL초 동안 재사용한다.
+    """
+    key = (id(client), container_name)
+    now = time.monotonic()
+    cached = _health.get(key)
+    if cached is not None and now < cached[0]:
+        return cached[1], cached[2]
+
+    try:
+        client.get_container_client(container_name).get_container_properties()
+        ok, error = True, None
+    except Exception as e:
+        ok, error = False, str(e)
+
+    interval = AZURE_HEALTH_CHECK_INTERVAL if ok else AZURE_HEALTH_CHECK_RETRY_INTERVAL
+    _health[key] = (time.monotonic() + interval, ok, error)
+    return ok, error
+
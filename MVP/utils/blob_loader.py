@@ -0,0 +1,334 @@
+# utils/blob_loader.py
+# Azure 블롭 병렬 로드 - 다운로드는 스레드 풀, CSV/Excel 파싱 + 정리는 프로세스 풀에서 실행
+import io
+import time
+import codecs
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import pandas as pd
+from utils.parquet_store import read_parquet_blob
+
+# 표준 컬럼 매핑 (원본 컬럼명 → 분석용 컬럼명)
+COLUMN_MAPPING = {
+    '청구항목명': 'service_name',
+    '단위서비스명': 'unit_service_name',
+    '청구금액': 'billing_amount',
+    '할인금액': 'discount_amount',
+    '회선수': 'line_count',
+    'lob명': 'lob_name',
+    'LOB명': 'lob_name',
+    '사업부': 'lob_name'
+}
+
+CSV_ENCODING_SAMPLE_BYTES = 64 * 1024   # 인코딩 판별에 쓰는 앞부분 크기
+
+# 블롭에서 읽을 원본 컬럼 (분석에 쓰는 컬럼만 다운로드/파싱)
+ANALYSIS_SOURCE_COLUMNS = list(COLUMN_MAPPING)
+
+# 로드한 프레임의 attrs 키 - 컬럼을 골라 읽기 전 원본 파일의 전체 컬럼 목록
+SOURCE_COLUMNS_ATTR = "source_columns"
+
+_parse_executor = None
+_parse_executor_workers = 0
+_parse_executor_lock = threading.Lock()
+
+
+def clean_billing_frame(df):
+    """데이터프레임 정리 및 표준화"""
+    # 컬럼명 정리
+    df.columns = df.columns.str.strip()
+
+    # 매핑 적용
+    for old_col, new_col in COLUMN_MAPPING.items():
+        if old_col in df.columns:
+            df[new_col] = df[old_col]
+
+    # 숫자 컬럼 정리
+    numeric_columns = ['billing_amount', 'line_count', 'discount_amount']
+    for col in numeric_columns:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    # 통합 서비스명 생성 (서비스 코드 포함)
+    if 'service_name' in df.columns:
+        df['full_service_id'] = df['service_name'].astype(str)
+        if 'unit_service_name' in df.columns:
+            df['full_service_id'] = df['service_name'].astype(str) + " | " + df['unit_service_name'].astype(str)
+
+    # 서비스 코드 추출
+    if 'full_service_id' in df.columns:
+        df['service_code'] = df['full_service_id'].str.extract(r'([A-Z]{2,5}[0-9]{2,4})', expand=False)
+
+    return df
+
+
+def detect_csv_encoding(sample):
+    """앞부분 샘플로 CSV 인코딩 판별 (BOM → UTF-8 → CP949)
+
+    CP949는 EUC-KR의 상위 집합이라 EUC-KR 파일도 그대로 읽힌다.
+    샘플 끝에서 잘린 멀티바이트 문자는 오류로 보지 않는다.
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'cp949'
+
+
+class ChunkStream(io.RawIOBase):
+    """바이트 청크 이터레이터(다운로드 스트림)를 읽기 전용 파일처럼 감싸는 래퍼"""
+
+    def __init__(self, chunks, head=b""):
+        self.chunks = iter(chunks)
+        self.pending = memoryview(head)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending:
+            try:
+                self.pending = memoryview(next(self.chunks))
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+
+class SourceColumnFilter:
+    """pandas usecols 함수 - 지정한 원본 컬럼만 통과 (컬럼명 앞뒤 공백 무시), 확인한 헤더 컬럼은 seen에 기록"""
+
+    def __init__(self, columns):
+        self.columns = frozenset(columns)
+        self.seen = {}
+
+    def __call__(self, col):
+        name = str(col).strip()
+        self.seen[name] = None
+        return name in self.columns
+
+
+def source_column_filter(columns):
+    """원본 컬럼 목록 → pandas usecols 함수 (columns=None이면 None - 전체)"""
+    if columns is None:
+        return None
+    return SourceColumnFilter(columns)
+
+
+def _mark_source_columns(df, usecols):
+    """프레임 attrs에 원본 파일의 전체 컬럼 기록 (골라 읽었으면 usecols가 확인한 헤더)"""
+    if usecols is not None:
+        df.attrs[SOURCE_COLUMNS_ATTR] = list(usecols.seen)
+    else:
+        df.attrs[SOURCE_COLUMNS_ATTR] = [str(col).strip() for col in df.columns]
+    return df
+
+
+def parse_csv_stream(chunks, reopen=None, usecols=None):
+    """CSV 스트림 파싱 (앞부분으로 인코딩을 한 번만 판별하고 문자열 변환 없이 바이트에서 바로 파싱)
+
+    reopen: 샘플 이후에 처음 한글이 나와 UTF-8 판별이 틀렸을 때 스트림을 다시 여는 함수
+    usecols: 읽을 컬럼 (pandas usecols와 같음, None이면 전체)
+    """
+    chunks = iter(chunks)
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= CSV_ENCODING_SAMPLE_BYTES:
+            break
+
+    encoding = detect_csv_encoding(head[:CSV_ENCODING_SAMPLE_BYTES])
+    try:
+        return pd.read_csv(io.BufferedReader(ChunkStream(chunks, head)), encoding=encoding, usecols=usecols)
+    except UnicodeDecodeError:
+        if encoding != 'utf-8' or reopen is None:
+            raise Exception("지원되지 않는 인코딩")
+
+    try:
+        return pd.read_csv(io.BufferedReader(ChunkStream(reopen())), encoding='cp949', usecols=usecols)
+    except UnicodeDecodeError:
+        raise Exception("지원되지 않는 인코딩")
+
+
+def parse_csv_bytes(content, usecols=None):
+    """CSV 바이트 파싱"""
+    return parse_csv_stream([content], reopen=lambda: [content], usecols=usecols)
+
+
+def parse_excel_bytes(content, usecols=None):
+    """Excel 바이트 파싱"""
+    return pd.read_excel(io.BytesIO(content), usecols=usecols)
+
+
+def parse_billing_blob(blob_name, content, columns=None):
+    """블롭 내용 파싱 + 정리 (워커 프로세스에서 실행, columns가 있으면 해당 원본 컬럼만) - (프레임, 파싱 시간) 반환"""
+    started = time.perf_counter()
+    usecols = source_column_filter(columns)
+    if blob_name.endswith('.csv'):
+        df = parse_csv_bytes(content, usecols=usecols)
+    elif blob_name.endswith('.parquet'):
+        usecols = None
+        df = pd.read_parquet(io.BytesIO(content))
+    else:
+        df = parse_excel_bytes(content, usecols=usecols)
+    _mark_source_columns(df, usecols)
+
+    if df is not None and len(df) > 0:
+        df = clean_billing_frame(df)
+    return df, time.perf_counter() - started
+
+
+def _get_parse_executor(workers):
+    """파싱용 프로세스 풀 (프로세스 공용, 워커 수가 바뀔 때만 재생성)"""
+    global _parse_executor, _parse_executor_workers
+    with _parse_executor_lock:
+        if _parse_executor is None or _parse_executor_workers != workers:
+            if _parse_executor is not None:
+                _parse_executor.shutdown(wait=False)
+            # Streamlit 서버는 멀티스레드이므로 fork 대신 spawn 사용
+            _parse_executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _parse_executor_workers = workers
+        return _parse_executor
+
+
+def _download(container_client, blob_name):
+    """블롭 다운로드 (스레드 풀에서 실행) - (내용, 다운로드 시간) 반환"""
+    started = time.perf_counter()
+    content = container_client.get_blob_client(blob_name).download_blob().readall()
+    return content, time.perf_counter() - started
+
+
+def _load_parquet(container_client, blob_name, columns, size):
+    """Parquet 블롭 구간 읽기 (필요한 컬럼만 다운로드) + 정리"""
+    started = time.perf_counter()
+    df, bytes_read, schema_names = read_parquet_blob(container_client.get_blob_client(blob_name), columns=columns, size=size)
+    df.attrs[SOURCE_COLUMNS_ATTR] = schema_names
+    download_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if len(df) > 0:
+        df = clean_billing_frame(df)
+    return df, download_seconds, time.perf_counter() - started, bytes_read
+
+
+def _stream_and_parse(container_client, blob_name, columns):
+    """CSV 다운로드 스트림에서 바로 파싱 (청크가 도착하는 대로 파싱, 전체 내용을 메모리에 모으지 않음)
+
+    다운로드와 파싱이 겹치므로 청크를 기다린 시간을 다운로드 시간, 나머지를 파싱 시간으로 기록
+    """
+    blob_client = container_client.get_blob_client(blob_name)
+    stats = {'wait': 0.0, 'bytes': 0}
+
+    def chunks():
+        stream = blob_client.download_blob().chunks()
+        while True:
+            waited = time.perf_counter()
+            try:
+                chunk = next(stream)
+            except StopIteration:
+                return
+            finally:
+                stats['wait'] += time.perf_counter() - waited
+            stats['bytes'] += len(chunk)
+            yield chunk
+
+    started = time.perf_counter()
+    usecols = source_column_filter(columns)
+    df = parse_csv_stream(chunks(), reopen=chunks, usecols=usecols)
+    _mark_source_columns(df, usecols)
+    if df is not None and len(df) > 0:
+        df = clean_billing_frame(df)
+    elapsed = time.perf_counter() - started
+    return df, stats['wait'], elapsed - stats['wait'], stats['bytes']
+
+
+def _download_and_parse(container_client, blob_name, columns):
+    """다운로드 + 같은 스레드에서 파싱 (프로세스 풀 미사용 시, CSV는 스트림에서 바로 파싱)"""
+    if blob_name.endswith('.csv'):
+        return _stream_and_parse(container_client, blob_name, columns)
+    content, download_seconds = _download(container_client, blob_name)
+    df, parse_seconds = parse_billing_blob(blob_name, content, columns)
+    return df, download_seconds, parse_seconds, len(content)
+
+
+def load_blobs(container_client, blob_names, download_workers, parse_workers, columns=ANALYSIS_SOURCE_COLUMNS, sizes=None):
+    """블롭 목록 병렬 로드
+
+    다운로드가 끝난 블롭부터 바로 파싱을 시작해서 네트워크 대기와 파싱을 겹친다.
+    프로세스 풀을 쓰지 않으면 CSV는 다운로드 스트림에서 바로 파싱한다 (프로세스 풀에는 내용 전체를 넘겨야 함).
+    columns: 읽을 원본 컬럼 (None이면 전체) - Parquet 블롭은 다운로드 스레드에서 해당 컬럼 구간만 읽고,
+             CSV/Excel은 파싱할 때 나머지 컬럼을 건너뛴다.
+    sizes: 블롭 이름 → 크기 (목록 조회 결과, 없으면 필요할 때 조회)
+    반환: 블롭 목록 순서의 결과 리스트
+          {'blob', 'data', 'error', 'download_seconds', 'parse_seconds', 'bytes'}
+    """
+    results = [
+        {'blob': name, 'data': None, 'error': None, 'download_seconds': 0.0, 'parse_seconds': 0.0, 'bytes': 0}
+        for name in blob_names
+    ]
+    if not blob_names:
+        return results
+
+    sizes = sizes or {}
+    use_processes = parse_workers > 1 and len(blob_names) > 1
+    download_pool = ThreadPoolExecutor(max_workers=max(1, min(download_workers, len(blob_names))))
+    try:
+        # Parquet 및 (프로세스 풀 미사용 시) 나머지 블롭: 스레드에서 다운로드 + 파싱
+        futures = {}
+        for i, name in enumerate(blob_names):
+            if name.endswith('.parquet'):
+                futures[download_pool.submit(_load_parquet, container_client, name, columns, sizes.get(name))] = i
+            elif not use_processes:
+                futures[download_pool.submit(_download_and_parse, container_client, name, columns)] = i
+        
+        if not use_processes:
+            for future in as_completed(futures):
+                result = results[futures[future]]
+                try:
+                    df, download_seconds, parse_seconds, size = future.result()
+                    result.update(data=df, download_seconds=download_seconds, parse_seconds=parse_seconds, bytes=size)
+                except Exception as e:
+                    result['error'] = e
+            return results
+
+        parse_pool = _get_parse_executor(parse_workers)
+        downloads = {
+            download_pool.submit(_download, container_client, name): i
+            for i, name in enumerate(blob_names)
+            if not name.endswith('.parquet')
+        }
+        parses = {}
+        for future in as_completed(downloads):
+            i = downloads[future]
+            try:
+                content, download_seconds = future.result()
+            except Exception as e:
+                results[i]['error'] = e
+                continue
+            results[i].update(download_seconds=download_seconds, bytes=len(content))
+            parses[parse_pool.submit(parse_billing_blob, blob_names[i], content, columns)] = i
+            del content
+
+        for future in as_completed(parses):
+            result = results[parses[future]]
+            try:
+                df, parse_seconds = future.result()
+                result.update(data=df, parse_seconds=parse_seconds)
+            except Exception as e:
+                result['error'] = e
+        
+        for future in as_completed(futures):
+            result = results[futures[future]]
+            try:
+                df, download_seconds, parse_seconds, size = future.result()
+                result.update(data=df, download_seconds=download_seconds, parse_seconds=parse_seconds, bytes=size)
+            except Exception as e:
+                result['error'] = e
+        return results
+    finally:
+        download_pool.shutdown(wait=False)
@@ -0,0 +1,53 @@
+# utils/blob_sync.py
+# Azure 블롭 동기화 커서 - 마지막 동기화 시점의 블롭별 버전(ETag, 수정시각)을 디스크에 저장해 변경분만 가져오기
+import os
+import json
+import time
+import threading
+from config.settings import AZURE_SYNC_CURSOR_PATH
+from utils.blob_cache import LocalBlobCache
+
+
+class SyncCursor:
+    """블롭 목록 동기화 커서 (프로세스 재시작 후에도 유지)"""
+
+    def __init__(self, path=AZURE_SYNC_CURSOR_PATH):
+        self.path = path
+        self.versions = {}
+        self.synced_at = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """커서 파일 읽기 (깨졌거나 없으면 처음 동기화로 취급)"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+            self.versions = {name: tuple(version) for name, version in state.get("versions", {}).items()}
+            self.synced_at = state.get("synced_at")
+        except (OSError, ValueError, AttributeError, TypeError):
+            self.versions = {}
+            self.synced_at = None
+
+    def diff(self, blobs):
+        """목록 조회 결과와 커서 비교 - (추가/변경된 블롭 목록, 삭제된 블롭 이름 집합)"""
+        with self._lock:
+            changed = [blob for blob in blobs if self.versions.get(blob.name) != LocalBlobCache.version_of(blob)]
+            removed = set(self.versions) - {blob.name for blob in blobs}
+        return changed, removed
+
+    def advance(self, blobs, removed=()):
+        """동기화 완료한 블롭 버전 반영 + 삭제된 블롭 제거 후 저장 (저장 실패는 무시 - 다음 동기화에서 다시 비교)"""
+        with self._lock:
+            self.versions.update({blob.name: LocalBlobCache.version_of(blob) for blob in blobs})
+            for name in removed:
+                self.versions.pop(name, None)
+            self.synced_at = time.time()
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                temp_path = self.path + ".tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump({"synced_at": self.synced_at, "versions": self.versions}, f, ensure_ascii=False)
+                os.replace(temp_path, self.path)
+            except OSError:
+                pass
@@ -0,0 +1,117 @@
+# utils/excel_convert.py
+# Excel 블롭 1회 변환 - 백그라운드에서 Excel을 파싱해 Parquet 사이드카(converted/)로 저장, 이후 로드는 Parquet만 읽음
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import CONVERTED_PREFIX, EXCEL_CONVERT_WORKERS
+from utils.blob_loader import parse_excel_bytes
+from utils.parquet_store import parquet_available, frame_to_parquet_bytes
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow 미설치 시 변환본 없이 원본 프레임만 전달
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+SOURCE_ETAG_KEY = "source_etag"
+
+
+def is_excel_blob(blob_name):
+    return blob_name.endswith(EXCEL_EXTENSIONS)
+
+
+def converted_blob_name(source_name):
+    """원본 Excel 블롭 이름 → 변환본 이름 (converted/{원본 경로}.parquet)"""
+    return f"{CONVERTED_PREFIX}{source_name}.parquet"
+
+
+def fresh_conversions(source_blobs, converted_blobs):
+    """원본 ETag와 일치하는 변환본 - {원본 이름: 변환본 이름} (converted_blobs는 metadata 포함 목록)"""
+    converted = {blob.name: blob for blob in converted_blobs}
+    fresh = {}
+    for blob in source_blobs:
+        candidate = converted.get(converted_blob_name(blob.name))
+        metadata = getattr(candidate, 'metadata', None) or {}
+        if candidate is not None and metadata.get(SOURCE_ETAG_KEY) == str(blob.etag):
+            fresh[blob.name] = candidate.name
+    return fresh
+
+
+def _parquet_ready(df):
+    """Parquet로 쓸 수 있게 혼합 타입 object 컬럼을 문자열 컬럼으로 변환"""
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].astype("string")
+    return df
+
+
+class ExcelConverter:
+    """Excel 변환 작업 실행기 (같은 블롭 버전은 한 번만 변환, 실패한 버전은 블롭이 바뀔 때까지 다시 시도하지 않음)"""
+
+    def __init__(self, workers=EXCEL_CONVERT_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="excel-convert")
+        self._pending = {}
+        self._failed = {}  # 블롭 이름 → (실패한 ETag, 오류 메시지)
+        self._lock = threading.Lock()
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def failure(self, blob):
+        """이 블롭 버전의 변환 실패 메시지 (실패하지 않았거나 블롭이 바뀌었으면 None)"""
+        with self._lock:
+            etag, error = self._failed.get(blob.name, (None, None))
+        return error if etag == blob.etag else None
+
+    def submit(self, container_client, blob, on_done):
+        """변환 예약 - 완료되면 on_done(blob, 원본 프레임) 호출 (변환에 실패한 버전은 예약하지 않음)"""
+        with self._lock:
+            if self._pending.get(blob.name) == blob.etag:
+                return False
+            if self._failed.get(blob.name, (None,))[0] == blob.etag:
+                return False
+            self._pending[blob.name] = blob.etag
+        self._executor.submit(self._convert, container_client, blob, on_done)
+        return True
+
+    def _convert(self, container_client, blob, on_done):
+        try:
+            content = container_client.get_blob_client(blob.name).download_blob().readall()
+            df = parse_excel_bytes(content)
+            if parquet_available():
+                try:
+                    payload = frame_to_parquet_bytes(df)
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    # 숫자/문자가 섞인 컬럼 등 → 문자열 컬럼으로 바꿔서 다시 저장
+                    payload = frame_to_parquet_bytes(_parquet_ready(df))
+                container_client.upload_blob(
+                    converted_blob_name(blob.name), payload, overwrite=True,
+                    metadata={SOURCE_ETAG_KEY: str(blob.etag)}
+                )
+            on_done(blob, df)
+            with self._lock:
+                self._failed.pop(blob.name, None)
+        except Exception as e:
+            logger.exception("Excel 변환 실패: %s (etag %s)", blob.name, blob.etag)
+            with self._lock:
+                self._failed[blob.name] = (blob.etag, str(e))
+        finally:
+            with self._lock:
+                self._pending.pop(blob.name, None)
+
+
+_excel_converter = None
+_excel_converter_lock = threading.Lock()
+
+
+def get_excel_converter():
+    """프로세스 공용 Excel 변환기"""
+    global _excel_converter
+    with _excel_converter_lock:
+        if _excel_converter is None:
+            _excel_converter = ExcelConverter()
+        return _excel_converter
@@ -0,0 +1,96 @@
+# utils/manifest.py
+# 파티션 매니페스트 - 월 데이터 파일별 월, 행 수, 컬럼, 금액 범위, 서비스 코드 목록을 JSON 블롭 하나로 관리
+import json
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceNotFoundError
+from config.settings import MANIFEST_BLOB
+from utils.blob_loader import SOURCE_COLUMNS_ATTR
+
+MANIFEST_VERSION = 1
+
+
+def partition_stats(etag, month, df, columns=None):
+    """로드한 프레임 → 매니페스트 항목
+
+    columns: 파일에 저장된 전체 컬럼 (None이면 로더가 프레임에 기록한 원본 컬럼 - 골라 읽기 전 스키마)
+    """
+    if columns is None:
+        columns = df.attrs.get(SOURCE_COLUMNS_ATTR, df.columns)
+    billing = df['billing_amount'] if 'billing_amount' in df.columns else None
+    service_codes = df['service_code'].dropna().unique().tolist() if 'service_code' in df.columns else []
+    return {
+        'month': month,
+        'etag': str(etag),
+        'rows': int(len(df)),
+        'columns': [str(col) for col in columns],
+        'billing_min': float(billing.min()) if billing is not None and len(df) > 0 else None,
+        'billing_max': float(billing.max()) if billing is not None and len(df) > 0 else None,
+        'service_codes': sorted(str(code) for code in service_codes)
+    }
+
+
+def read_manifest(container_client):
+    """매니페스트 읽기 - (내용, ETag) (없으면 빈 매니페스트, ETag None)"""
+    try:
+        downloader = container_client.get_blob_client(MANIFEST_BLOB).download_blob()
+        manifest = json.loads(downloader.readall())
+        return manifest, downloader.properties.etag
+    except ResourceNotFoundError:
+        return {'version': MANIFEST_VERSION, 'partitions': {}}, None
+
+
+def write_manifest_entries(container_client, entries, removed=()):
+    """매니페스트 항목 병합 저장 (읽은 뒤 다른 곳에서 바뀌었으면 실패 - 업로드 대기열이 재시도)"""
+    try:
+        manifest, etag = read_manifest(container_client)
+        partitions = manifest.setdefault('partitions', {})
+        partitions.update(entries)
+        for name in removed:
+            partitions.pop(name, None)
+        manifest['version'] = MANIFEST_VERSION
+
+        payload = json.dumps(manifest, ensure_ascii=False)
+        blob_client = container_client.get_blob_client(MANIFEST_BLOB)
+        if etag is None:
+            blob_client.upload_blob(payload, overwrite=False)
+        else:
+            blob_client.upload_blob(payload, overwrite=True, etag=etag, match_condition=MatchConditions.IfNotModified)
+        return True, MANIFEST_BLOB
+    except Exception as e:
+        return False, str(e)
+
+
+def stale_partitions(manifest, blobs):
+    """매니페스트에 없거나 ETag가 다른 블롭 이름 집합"""
+    partitions = (manifest or {}).get('partitions', {})
+    return {blob.name for blob in blobs if partitions.get(blob.name, {}).get('etag') != str(blob.etag)}
+
+
+def select_partitions(manifest, blobs, months, scope, service_code=None):
+    """질문 범위에 필요한 블롭만 선택 (months: 블롭 이름 → 월)
+
+    scope: "all" (전체), "latest" (최신 월), "first_last" (첫 월 + 최신 월),
+           "service_code" (해당 코드가 있는 월 - 매니페스트가 모든 블롭을 최신으로 덮을 때만, 아니면 전체)
+    이름에 월이 없는 블롭(요금제 카탈로그 등)은 월 범위 질문에서 제외 (월을 아는 블롭이 하나도 없으면 전체)
+    """
+    dated = [blob for blob in blobs if months.get(blob.name) and not months[blob.name].startswith('unknown')]
+    if scope == "all" or not dated:
+        return list(blobs)
+    blobs = dated
+
+    ordered = sorted({months[blob.name] for blob in blobs})
+    if scope == "first_last":
+        wanted = {ordered[0], ordered[-1]}
+    elif scope == "service_code":
+        if stale_partitions(manifest, blobs):
+            return list(blobs)
+        partitions = manifest.get('partitions', {})
+        wanted = {
+            months[blob.name] for blob in blobs
+            if service_code in partitions[blob.name].get('service_codes', [])
+        }
+        # 어느 월에도 없으면 최신 월만 읽어서 "찾을 수 없음" 응답
+        wanted = wanted or {ordered[-1]}
+    else:
+        wanted = {ordered[-1]}
+    return [blob for blob in blobs if months[blob.name] in wanted]
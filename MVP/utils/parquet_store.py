@@ -0,0 +1,90 @@
+# utils/parquet_store.py
+# Parquet 저장/조회 - zstd 압축 쓰기 + 블롭 구간(range) 읽기로 필요한 컬럼/행 그룹만 다운로드
+import io
+from config.constants import PARQUET_COMPRESSION, PARQUET_ROW_GROUP_ROWS, PARQUET_RANGE_READ_MIN_BYTES
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 미설치 시 CSV 저장 방식만 사용
+    pq = None
+
+
+def parquet_available():
+    """Parquet 읽기/쓰기 가능 여부"""
+    return pq is not None
+
+
+class BlobRangeReader(io.RawIOBase):
+    """블롭을 파일처럼 읽는 래퍼 - read 호출마다 해당 구간만 다운로드"""
+
+    def __init__(self, blob_client, size=None):
+        self.blob_client = blob_client
+        self.size = size if size is not None else blob_client.get_blob_properties().size
+        self.position = 0
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self.position = offset
+        elif whence == io.SEEK_CUR:
+            self.position += offset
+        else:
+            self.position = self.size + offset
+        return self.position
+
+    def tell(self):
+        return self.position
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.size - self.position
+        size = min(size, self.size - self.position)
+        if size <= 0:
+            return b""
+        data = self.blob_client.download_blob(offset=self.position, length=size).readall()
+        self.position += len(data)
+        self.bytes_read += len(data)
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def frame_to_parquet_bytes(df):
+    """프레임 → Parquet 바이트 (zstd 압축, 행 그룹 단위 통계 포함)"""
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False, compression=PARQUET_COMPRESSION, row_group_size=PARQUET_ROW_GROUP_ROWS)
+    return buffer.getvalue()
+
+
+def read_parquet_blob(blob_client, columns=None, size=None):
+    """Parquet 블롭 읽기 - (프레임, 실제 다운로드 바이트, 파일의 전체 컬럼 목록) 반환
+
+    columns: 읽을 컬럼 (파일에 없는 컬럼은 무시, None이면 전체)
+    size: 블롭 크기 (목록 조회 결과) - 작은 파일은 구간 요청 여러 번보다 한 번에 받는 편이 빠름
+    """
+    if size is not None and size <= PARQUET_RANGE_READ_MIN_BYTES:
+        content = blob_client.download_blob().readall()
+        reader = io.BytesIO(content)
+        bytes_read = len(content)
+    else:
+        reader = BlobRangeReader(blob_client, size=size)
+        bytes_read = None
+
+    parquet_file = pq.ParquetFile(reader)
+    schema_names = parquet_file.schema_arrow.names
+    if columns is not None:
+        columns = [col for col in columns if col in schema_names]
+
+    table = parquet_file.read(columns=columns)
+    if bytes_read is None:
+        bytes_read = reader.bytes_read
+    return table.to_pandas(), bytes_read, schema_names
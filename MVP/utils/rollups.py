@@ -0,0 +1,60 @@
+# utils/rollups.py
+# 월별 집계 사이드카 - 월 데이터 블롭마다 LOB × 서비스 합계(청구금액, 회선수, 할인금액)를 작은 블롭으로 저장
+from config.settings import ROLLUP_PREFIX
+from utils.blob_loader import clean_billing_frame
+
+ROLLUP_KEYS = ['lob_name', 'full_service_id', 'service_code']
+ROLLUP_VALUES = ['billing_amount', 'line_count', 'discount_amount']
+
+
+def rollup_blob_name(source_name, extension):
+    """원본 블롭 이름 → 집계 블롭 이름 (rollups/{원본 경로}.{확장자})"""
+    return f"{ROLLUP_PREFIX}{source_name}.{extension}"
+
+
+def source_blob_name(rollup_name):
+    """집계 블롭 이름 → 원본 블롭 이름"""
+    return rollup_name[len(ROLLUP_PREFIX):].rsplit('.', 1)[0]
+
+
+def build_rollup(df):
+    """월 프레임 → LOB × 서비스 집계 (서비스 ID 없는 행도 하나의 그룹으로 유지해서 월 합계가 원본과 같음)
+
+    원본에 없는 키 컬럼은 집계에도 넣지 않음 (LOB 컬럼이 없으면 LOB 분석도 원본과 같이 건너뜀)
+    월 데이터가 아닌 프레임(빈 프레임, 청구금액 컬럼 없음)은 빈 집계 - 집계가 모든 원본에 있는지 판단할 때 필요
+    """
+    if 'full_service_id' not in df.columns:
+        df = clean_billing_frame(df.copy())
+    if len(df) == 0 or 'billing_amount' not in df.columns:
+        return df.iloc[0:0].reindex(columns=ROLLUP_KEYS + ROLLUP_VALUES)
+
+    keys = [col for col in ROLLUP_KEYS if col in df.columns]
+    values = [col for col in ROLLUP_VALUES if col in df.columns]
+    if keys:
+        rollup = df.groupby(keys, dropna=False, sort=False, observed=True)[values].sum().reset_index()
+    else:
+        rollup = df[values].sum().to_frame().T
+    for col in ROLLUP_VALUES:
+        if col not in rollup.columns:
+            rollup[col] = 0
+    return rollup[keys + ROLLUP_VALUES]
+
+
+def drop_empty_keys(rollup):
+    """값이 모두 비어 있는 키 컬럼 제거 (원본에 없던 컬럼을 빈 값으로 채워 저장한 이전 집계 호환)"""
+    empty = [col for col in ROLLUP_KEYS if col in rollup.columns and rollup[col].isna().all()]
+    return rollup.drop(columns=empty) if empty else rollup
+
+
+def fresh_rollups(source_blobs, rollup_blobs):
+    """원본 블롭별 최신 집계 블롭 이름 - {원본 이름: 집계 이름} (원본보다 나중에 쓰인 집계만)"""
+    rollups = {source_blob_name(blob.name): blob for blob in rollup_blobs}
+    fresh = {}
+    for blob in source_blobs:
+        rollup = rollups.get(blob.name)
+        if rollup is None:
+            continue
+        if rollup.last_modified is not None and blob.last_modified is not None and rollup.last_modified < blob.last_modified:
+            continue
+        fresh[blob.name] = rollup.name
+    return fresh
@@ -0,0 +1,60 @@
+# utils/service_index.py
+# 서비스명 역색인 - 소문자 n-gram → 서비스 위치 집합 (키워드 검색을 문자열 스캔 대신 집합 연산으로)
+import re
+
+NGRAM_SIZE = 3
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def _ngrams(text, size):
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class ServiceTextIndex:
+    """서비스 ID 역색인 (대소문자 무시 부분 문자열 검색)
+
+    한글/영문 토큰마다 길이 1~NGRAM_SIZE의 n-gram을 색인한다.
+    NGRAM_SIZE 이하 키워드는 색인 조회 한 번, 더 긴 키워드는 n-gram 집합 교집합으로
+    후보를 줄인 뒤 후보만 실제 포함 여부를 확인한다.
+    """
+
+    def __init__(self, services):
+        self.services = list(services)
+        self._lowered = [str(service).lower() for service in self.services]
+        self.postings = {}
+
+        for position, text in enumerate(self._lowered):
+            grams = set()
+            for token in TOKEN_PATTERN.findall(text):
+                for size in range(1, NGRAM_SIZE + 1):
+                    grams |= _ngrams(token, size)
+            for gram in grams:
+                self.postings.setdefault(gram, set()).add(position)
+
+    def search(self, keyword):
+        """키워드를 포함하는 서비스 위치 집합"""
+        keyword = str(keyword).lower()
+        if not keyword:
+            return set(range(len(self.services)))
+
+        # 단어 문자가 아닌 글자(공백, 기호 등)는 색인하지 않으므로 전체 후보에서 확인
+        if not TOKEN_PATTERN.fullmatch(keyword):
+            return {i for i, text in enumerate(self._lowered) if keyword in text}
+
+        if len(keyword) <= NGRAM_SIZE:
+            return set(self.postings.get(keyword, ()))
+
+        grams = sorted(_ngrams(keyword, NGRAM_SIZE), key=lambda gram: len(self.postings.get(gram, ())))
+        candidates = set(self.postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not candidates:
+                break
+            candidates &= self.postings.get(gram, set())
+        return {i for i in candidates if keyword in self._lowered[i]}
+
+    def search_any(self, keywords):
+        """키워드 중 하나라도 포함하는 서비스 위치 집합"""
+        matches = set()
+        for keyword in keywords:
+            matches |= self.search(keyword)
+        return matches
@@ -5,6 +5,12 @@ import uuid
 import pickle
 import json
 
+def get_browser_session_id():
+    """브라우저 세션 ID (채팅 세션을 바꿔도 유지 - 세션별 백그라운드 작업 구분용)"""
+    if 'browser_session_id' not in st.session_state:
+        st.session_state.browser_session_id = uuid.uuid4().hex
+    return st.session_state.browser_session_id
+
 class SessionManager:
     def __init__(self):
         pass
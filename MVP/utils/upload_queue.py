@@ -0,0 +1,119 @@
+# utils/upload_queue.py
+# Azure 백그라운드 업로드 대기열 - 업로드는 워커 스레드에서 실행 (실패 시 지수 백오프 재시도), 상태는 UI에서 조회
+import time
+import uuid
+import queue
+import threading
+from collections import OrderedDict
+from config.settings import (
+    AZURE_UPLOAD_WORKERS, AZURE_UPLOAD_RETRIES, AZURE_UPLOAD_BACKOFF_SECONDS, UPLOAD_STATUS_MAX_JOBS
+)
+
+STATUS_QUEUED = "대기"
+STATUS_RUNNING = "업로드 중"
+STATUS_RETRYING = "재시도 대기"
+STATUS_DONE = "완료"
+STATUS_FAILED = "실패"
+
+
+class UploadQueue:
+    """업로드 작업 대기열 (프로세스 공용, 워커는 첫 작업 제출 시 시작)"""
+
+    def __init__(self, workers=AZURE_UPLOAD_WORKERS):
+        self.workers = workers
+        self._queue = queue.Queue()
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def submit(self, filename, upload, owner=None):
+        """업로드 작업 추가 - upload()는 (성공 여부, 결과/오류 메시지)를 반환 / 반환: 작업 ID
+
+        owner: 작업을 제출한 세션 ID (상태 조회 시 해당 세션 작업만 보여줌)
+        """
+        job = {
+            'id': uuid.uuid4().hex,
+            'owner': owner,
+            'file': filename,
+            'status': STATUS_QUEUED,
+            'attempts': 0,
+            'result': None,
+            'error': None,
+            'submitted_at': time.time(),
+            'finished_at': None
+        }
+        with self._lock:
+            self._jobs[job['id']] = job
+            # 끝난 작업부터 오래된 순으로 정리
+            finished = [job_id for job_id, j in self._jobs.items() if j['finished_at'] is not None]
+            for job_id in finished[:max(0, len(self._jobs) - UPLOAD_STATUS_MAX_JOBS)]:
+                del self._jobs[job_id]
+            self._start_workers()
+        self._queue.put((job, upload))
+        return job['id']
+
+    def _start_workers(self):
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._run, name="azure-upload", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            job, upload = self._queue.get()
+            try:
+                self._process(job, upload)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, job, upload):
+        """업로드 실행 (실패 시 AZURE_UPLOAD_BACKOFF_SECONDS × 2^n초 후 재시도)"""
+        for attempt in range(AZURE_UPLOAD_RETRIES + 1):
+            self._update(job, status=STATUS_RUNNING, attempts=attempt + 1)
+            try:
+                success, result = upload()
+            except Exception as e:
+                success, result = False, str(e)
+
+            if success:
+                self._update(job, status=STATUS_DONE, result=result, error=None, finished_at=time.time())
+                return
+
+            if attempt < AZURE_UPLOAD_RETRIES:
+                self._update(job, status=STATUS_RETRYING, error=result)
+                time.sleep(AZURE_UPLOAD_BACKOFF_SECONDS * (2 ** attempt))
+            else:
+                self._update(job, status=STATUS_FAILED, error=result, finished_at=time.time())
+
+    def _update(self, job, **fields):
+        with self._lock:
+            job.update(fields)
+
+    def jobs(self, owner):
+        """세션의 작업 상태 목록 (최근 제출 순, 다른 세션 작업은 제외)"""
+        with self._lock:
+            return [dict(job) for job in reversed(self._jobs.values()) if job['owner'] == owner]
+
+
+_upload_queue = None
+_sidecar_queue = None
+_upload_queue_lock = threading.Lock()
+
+
+def get_upload_queue():
+    """프로세스 공용 업로드 대기열"""
+    global _upload_queue
+    with _upload_queue_lock:
+        if _upload_queue is None:
+            _upload_queue = UploadQueue()
+        return _upload_queue
+
+
+def get_sidecar_queue():
+    """프로세스 공용 내부 쓰기 대기열 (집계/매니페스트 보충 - 같은 재시도, 사이드바에는 표시하지 않음)"""
+    global _sidecar_queue
+    with _upload_queue_lock:
+        if _sidecar_queue is None:
+            _sidecar_queue = UploadQueue(workers=1)
+        return _sidecar_queue